@@ -8,19 +8,55 @@ validation, security checks, and audit logging.
 
 import frappe
 from frappe import _
-from frappe.utils import get_datetime, now_datetime, add_to_date, random_string, cint, cstr
+from frappe.utils import get_datetime, now_datetime, random_string, cint, cstr
 from frappe.rate_limiter import rate_limit
+from frappe.utils.caching import request_cache
+from collections import defaultdict
+from functools import partial
+from datetime import datetime, timedelta
 import re
 from typing import Any
 
+from mail.api.mail import convert_img_src_from_base64_to_cid
+from mail.client.doctype.mail_queue.mail_queue import MailQueue
+from mail.utils import convert_html_to_text
+
+from mail_scheduler.jmap.futurerelease import (
+	email_submissions_cancel,
+	email_submissions_cancel_many,
+	get_max_schedule_days,
+)
+from mail_scheduler.utils import invalidate_next_due, scheduled_send
+
 # Constants
 MIN_SCHEDULE_MINUTES = 1
-MAX_SCHEDULE_DAYS = 30
 MAX_RECIPIENTS = 500
 MAX_ATTACHMENTS = 25
 MAX_ATTACHMENT_SIZE_MB = 25
 MAX_SUBJECT_LENGTH = 998  # RFC 5322
 MAX_BODY_SIZE_MB = 50
+MAX_PAGE_LENGTH = 100
+MAX_PAGE_OFFSET = 10_000  # deeper pages must use the keyset cursor
+MAX_BATCH_SIZE = 100
+DEFAULT_SEND_QUEUE = "short"
+SCHEDULED_MAIL_FIELDS = ("name", "subject", "from_email", "scheduled_at", "status", "creation", "recipients")
+DEFAULT_SCHEDULED_MAIL_FIELDS = ("name", "subject", "scheduled_at", "status")
+SCHEDULED_COUNT_CACHE_KEY = "mail_scheduler:scheduled_mail_count"
+SCHEDULED_COUNT_CACHE_TTL = 60  # seconds
+MAIL_BATCH_CACHE_KEY = "mail_scheduler:mail_batch"
+MAIL_BATCH_RESULT_TTL = 86400  # seconds a queued batch's results can be looked up
+
+_MIN_SCHEDULE_DELTA = timedelta(minutes=MIN_SCHEDULE_MINUTES)
+
+# Arguments a create_mail_batch message may carry
+_CREATE_MAIL_ARGS = frozenset((
+	"from_email", "to", "cc", "bcc", "subject", "html_body", "from_name", "attachments",
+	"in_reply_to", "in_reply_to_id", "forwarded_from_id", "save_as_draft", "scheduled_at",
+))
+
+_SPLIT_RE = re.compile(r"\s*,\s*")
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_IMG_SRC_RE = re.compile(r"""(<img\b[^>]*?(?<![\w-])src\s*=\s*)(["'])(.*?)\2""", re.IGNORECASE | re.DOTALL)
 
 
 class SchedulerValidationError(frappe.ValidationError):
@@ -70,6 +106,97 @@ def _validate_user_permissions() -> None:
 		raise SchedulerSecurityError(_("You do not have permission to send emails"))
 
 
+@request_cache
+def _is_system_manager(user: str) -> bool:
+	"""Check whether a user is a System Manager, once per request."""
+	return "System Manager" in frappe.get_roles(user)
+
+
+def _require_owner(
+	doctype: str,
+	name: str,
+	owner_field: str = "user",
+	fields: list[str] | None = None,
+) -> dict:
+	"""
+	Validate that the current user owns a document before loading it.
+
+	Reads only the owner column (plus any requested fields) in a single
+	query, so unauthorized requests are rejected without fetching the full
+	document and its child tables.
+
+	Args:
+		doctype: DocType of the document
+		name: Name of the document
+		owner_field: Field holding the owning user
+		fields: Additional fields to return
+
+	Returns:
+		dict with the owner field and the requested fields
+
+	Raises:
+		SchedulerValidationError: If the document does not exist
+		SchedulerSecurityError: If the user neither owns the document nor is a System Manager
+	"""
+	row = frappe.db.get_value(doctype, name, [owner_field, *(fields or [])], as_dict=True)
+	if not row:
+		raise SchedulerValidationError(_("Scheduled email not found"))
+
+	user = frappe.session.user
+	if row[owner_field] != user and not _is_system_manager(user):
+		raise SchedulerSecurityError(_("You do not have permission to access this email"))
+
+	return row
+
+
+def _load_mail_queue_meta(name: str) -> dict:
+	"""
+	Load the Mail Queue fields needed to decide on a cancel or reschedule.
+
+	Ownership is the permission here: the row is only returned to its owner
+	or a System Manager, so no separate write permission check is run.
+
+	Args:
+		name: Name of the Mail Queue document
+
+	Returns:
+		dict with user, id, status, scheduled_at and submission_id
+	"""
+	return _require_owner(
+		"Mail Queue", name, fields=["id", "status", "scheduled_at", "submission_id"]
+	)
+
+
+def _lock_mail_queue(name: str, mail_queue: dict) -> None:
+	"""
+	Lock a Mail Queue row for the rest of the transaction.
+
+	Uses SELECT ... FOR UPDATE SKIP LOCKED, so an overlapping request on the
+	same email fails fast instead of waiting and then submitting to JMAP a
+	second time. The locked row's status, scheduled_at and submission_id
+	are reloaded into `mail_queue`.
+
+	Args:
+		name: Name of the Mail Queue document
+		mail_queue: Row returned by _load_mail_queue_meta for it
+
+	Raises:
+		SchedulerValidationError: If the row is locked by another request
+	"""
+	MailQueueTable = frappe.qb.DocType("Mail Queue")
+	rows = (
+		frappe.qb.from_(MailQueueTable)
+		.select(MailQueueTable.status, MailQueueTable.scheduled_at, MailQueueTable.submission_id)
+		.where(MailQueueTable.name == name)
+		.for_update(skip_locked=True)
+		.run(as_dict=True)
+	)
+	if not rows:
+		raise SchedulerValidationError(_("This email is already being updated, please try again"))
+
+	mail_queue.update(rows[0])
+
+
 def _validate_email_address(email: str) -> bool:
 	"""
 	Validate email address format.
@@ -83,15 +210,13 @@ def _validate_email_address(email: str) -> bool:
 	if not email:
 		return False
 	
-	# Basic email regex pattern
-	pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-	if not re.match(pattern, email.strip()):
+	if not _EMAIL_RE.match(email.strip()):
 		raise SchedulerValidationError(_("Invalid email address: {0}").format(email))
 	
 	return True
 
 
-def _validate_recipients(to: list, cc: list, bcc: list) -> None:
+def _validate_recipients(to: list, cc: list, bcc: list, check_format: bool = True) -> None:
 	"""
 	Validate recipient lists.
 	
@@ -99,6 +224,7 @@ def _validate_recipients(to: list, cc: list, bcc: list) -> None:
 		to: To recipients
 		cc: CC recipients
 		bcc: BCC recipients
+		check_format: Also check the format of each address
 	"""
 	total_recipients = len(to or []) + len(cc or []) + len(bcc or [])
 	
@@ -110,10 +236,16 @@ def _validate_recipients(to: list, cc: list, bcc: list) -> None:
 			_("Too many recipients. Maximum allowed: {0}").format(MAX_RECIPIENTS)
 		)
 	
-	# Validate each email address
-	all_emails = (to or []) + (cc or []) + (bcc or [])
-	for email in all_emails:
-		_validate_email_address(email)
+	if not check_format:
+		return
+
+	# Validate each email address without concatenating the lists; the
+	# pattern is matched inline to skip a function call per recipient
+	match = _EMAIL_RE.match
+	for emails in (to, cc, bcc):
+		for email in emails or []:
+			if email and not match(email.strip()):
+				raise SchedulerValidationError(_("Invalid email address: {0}").format(email))
 
 
 def _validate_sender(from_email: str) -> None:
@@ -135,63 +267,123 @@ def _validate_sender(from_email: str) -> None:
 	
 	if not identity_exists:
 		# Check for shared identities or admin override
-		is_admin = "System Manager" in frappe.get_roles(user)
+		is_admin = _is_system_manager(user)
 		if not is_admin:
 			raise SchedulerSecurityError(
 				_("You do not have permission to send from {0}").format(from_email)
 			)
 
 
-def _validate_attachments(attachments: list | None) -> None:
+def _build_attachments(
+	attachments: list | None, keep_cids: bool = False
+) -> tuple[list[dict], dict[str, str]]:
 	"""
-	Validate attachment constraints.
-	
+	Validate attachment constraints and build the attachment rows.
+
+	Validation, sanitizing and the inline content ID map are done in one
+	pass over the attachments.
+
 	Args:
 		attachments: List of attachment dicts
+		keep_cids: Reuse the content IDs the attachments already have
+
+	Returns:
+		tuple of the attachment rows and the content ID per file URL of
+		the inline attachments
+
+	Raises:
+		SchedulerValidationError: If there are too many or too large attachments
 	"""
 	if not attachments:
-		return
-	
+		return [], {}
+
 	if len(attachments) > MAX_ATTACHMENTS:
 		raise SchedulerValidationError(
 			_("Too many attachments. Maximum allowed: {0}").format(MAX_ATTACHMENTS)
 		)
-	
+
+	max_size = MAX_ATTACHMENT_SIZE_MB * 1024 * 1024
+	rows = []
+	cid_by_url = {}
 	total_size = 0
-	for att in attachments:
-		size = cint(att.get("size", 0))
+	for d in attachments:
+		size = cint(d.get("size", 0))
 		total_size += size
-		
+
 		# Check individual attachment size
-		if size > MAX_ATTACHMENT_SIZE_MB * 1024 * 1024:
+		if size > max_size:
 			raise SchedulerValidationError(
 				_("Attachment {0} exceeds maximum size of {1}MB").format(
-					att.get("filename", "unknown"), MAX_ATTACHMENT_SIZE_MB
+					d.get("filename", "unknown"), MAX_ATTACHMENT_SIZE_MB
 				)
 			)
-	
+
+		row = {
+			"file_url": _sanitize_input(d.get("file_url", "")),
+			"blob_id": _sanitize_input(d.get("blob_id", "")),
+			"filename": _sanitize_input(d.get("file_name") or d.get("filename", "")),
+			"type": _sanitize_input(d.get("type", "")),
+			"size": size,
+			"disposition": _sanitize_input(d.get("disposition")),
+			"cid": (keep_cids and d.get("cid")) or random_string(10),
+		}
+		rows.append(row)
+
+		if d.get("disposition") == "inline" and d.get("file_url"):
+			cid_by_url[d.get("file_url")] = row["cid"]
+
 	# Check total size
 	if total_size > MAX_BODY_SIZE_MB * 1024 * 1024:
 		raise SchedulerValidationError(
 			_("Total attachment size exceeds maximum of {0}MB").format(MAX_BODY_SIZE_MB)
 		)
 
+	return rows, cid_by_url
+
 
-def _validate_schedule_time(scheduled_at: str) -> None:
+def _parse_datetime(value: str | datetime) -> datetime:
+	"""
+	Parse a datetime, skipping frappe's parser for the common formats.
+
+	Naive ISO strings (including "YYYY-MM-DD HH:MM:SS") go through
+	datetime.fromisoformat; anything else falls back to get_datetime.
+
+	Args:
+		value: datetime or datetime string
+
+	Returns:
+		The parsed datetime
+	"""
+	if isinstance(value, datetime):
+		return value
+
+	try:
+		dt = datetime.fromisoformat(value)
+	except (TypeError, ValueError):
+		return get_datetime(value)
+
+	# Keep get_datetime's handling of timezone aware input
+	return dt if dt.tzinfo is None else get_datetime(value)
+
+
+def _validate_schedule_time(scheduled_at: str) -> datetime | None:
 	"""
 	Validate that the scheduled time is valid.
 
 	Args:
 		scheduled_at: Datetime string to validate
 
+	Returns:
+		The parsed datetime, so callers don't parse it again
+
 	Raises:
 		SchedulerValidationError: If the time is invalid
 	"""
 	if not scheduled_at:
-		return
+		return None
 	
 	try:
-		schedule_dt = get_datetime(scheduled_at)
+		schedule_dt = _parse_datetime(scheduled_at)
 	except Exception as e:
 		raise SchedulerValidationError(
 			_("Invalid datetime format for scheduled_at: {0}").format(str(e))
@@ -200,19 +392,21 @@ def _validate_schedule_time(scheduled_at: str) -> None:
 	now = now_datetime()
 
 	# Must be in the future (with grace period)
-	min_schedule_time = add_to_date(now, minutes=MIN_SCHEDULE_MINUTES)
+	min_schedule_time = now + _MIN_SCHEDULE_DELTA
 	if schedule_dt < min_schedule_time:
 		raise SchedulerValidationError(
 			_("Scheduled time must be at least {0} minute(s) in the future").format(MIN_SCHEDULE_MINUTES)
 		)
 
-	# Must be within maximum limit
-	max_schedule_time = add_to_date(now, days=MAX_SCHEDULE_DAYS)
-	if schedule_dt > max_schedule_time:
+	# Must be within maximum limit, the same one the mail page shows
+	max_schedule_days = get_max_schedule_days()
+	if schedule_dt > now + timedelta(days=max_schedule_days):
 		raise SchedulerValidationError(
-			_("Scheduled time cannot be more than {0} days in the future").format(MAX_SCHEDULE_DAYS)
+			_("Scheduled time cannot be more than {0} days in the future").format(max_schedule_days)
 		)
 
+	return schedule_dt
+
 
 def _validate_subject(subject: str | None) -> None:
 	"""Validate email subject."""
@@ -230,6 +424,130 @@ def _validate_body(html_body: str | None) -> None:
 		)
 
 
+def _get_scheduled_mail_count(user: str, status: str | None = None) -> int:
+	"""
+	Get the number of scheduled emails of a user, cached in Redis.
+
+	Counts are kept per user in a hash keyed by status and expire after
+	SCHEDULED_COUNT_CACHE_TTL seconds.
+
+	Args:
+		user: User whose scheduled emails are counted
+		status: Optional status filter
+
+	Returns:
+		Number of matching scheduled emails
+	"""
+	cache = frappe.cache()
+	key = f"{SCHEDULED_COUNT_CACHE_KEY}|{user}"
+	field = status or "*"
+
+	count = cache.hget(key, field)
+	if count is None:
+		filters = {
+			"user": user,
+			"scheduled_at": ["is", "set"],
+		}
+		if status:
+			filters["status"] = status
+
+		count = frappe.db.count("Mail Queue", filters)
+		cache.hset(key, field, count)
+		cache.expire(cache.make_key(key), SCHEDULED_COUNT_CACHE_TTL)
+
+	return cint(count)
+
+
+def _invalidate_scheduled_mail_count(user: str | None = None) -> None:
+	"""Drop the cached scheduled email counts of a user."""
+	frappe.cache().delete_value(f"{SCHEDULED_COUNT_CACHE_KEY}|{user or frappe.session.user}")
+
+
+def _bulk_set_mail_queue_status(names: list[str], status: str, values: dict | None = None) -> None:
+	"""
+	Set the status of several Mail Queue rows with a single UPDATE.
+
+	Args:
+		names: Names of the Mail Queue documents
+		status: New status
+		values: Other columns to set on the same rows
+	"""
+	if not names:
+		return
+
+	MailQueueTable = frappe.qb.DocType("Mail Queue")
+	query = (
+		frappe.qb.update(MailQueueTable)
+		.set(MailQueueTable.status, status)
+		.set(MailQueueTable.modified, now_datetime())
+		.set(MailQueueTable.modified_by, frappe.session.user)
+		.where(MailQueueTable.name.isin(names))
+	)
+	for column, value in (values or {}).items():
+		query = query.set(MailQueueTable[column], value)
+
+	query.run()
+
+
+def _attach_recipients(mails: list[dict]) -> None:
+	"""
+	Load the recipients of several Mail Queue rows with one query.
+
+	Sets "recipients" and the "to", "cc" and "bcc" address lists on each row.
+
+	Args:
+		mails: Mail Queue rows, each with a name
+	"""
+	if not mails:
+		return
+
+	recipients_map = defaultdict(list)
+	for r in frappe.get_all(
+		"Mail Queue Recipient",
+		filters={"parent": ["in", [mail.name for mail in mails]]},
+		fields=["parent", "email", "type"],
+		order_by="idx asc",
+	):
+		recipients_map[r.parent].append(r)
+
+	for mail in mails:
+		mail_recipients = recipients_map[mail.name]
+		buckets = defaultdict(list)
+		for r in mail_recipients:
+			buckets[r.type].append(r.email)
+
+		mail["recipients"] = mail_recipients
+		mail["to"] = buckets["To"]
+		mail["cc"] = buckets["Cc"]
+		mail["bcc"] = buckets["Bcc"]
+
+
+def _validate_page_offset(offset: int) -> int:
+	"""
+	Validate a pagination offset.
+
+	Large offsets make the database scan and discard every skipped row, so
+	they are rejected in favour of a filter or the keyset cursor.
+
+	Args:
+		offset: Requested offset
+
+	Returns:
+		The offset as a non-negative integer
+
+	Raises:
+		SchedulerValidationError: If the offset exceeds MAX_PAGE_OFFSET
+	"""
+	offset = max(cint(offset) or 0, 0)
+	if offset > MAX_PAGE_OFFSET:
+		raise SchedulerValidationError(
+			_("Offset too large. Maximum allowed: {0}. Use a status filter or the pagination cursor instead").format(
+				MAX_PAGE_OFFSET
+			)
+		)
+	return offset
+
+
 def _sanitize_input(value: Any) -> Any:
 	"""
 	Sanitize input to prevent injection attacks.
@@ -249,13 +567,63 @@ def _sanitize_input(value: Any) -> Any:
 	return value
 
 
-@frappe.whitelist()
-@rate_limit(limit=60, seconds=60)  # 60 requests per minute
-def create_mail(
+def _parse_recipients(value: list | str | None) -> list[str]:
+	"""
+	Normalize a recipient list into sanitized, stripped addresses.
+
+	Args:
+		value: List of addresses, a comma separated string or None
+
+	Returns:
+		List of non-empty addresses; the input list itself if it is already clean
+	"""
+	if not value:
+		return []
+
+	if isinstance(value, str):
+		parts = _SPLIT_RE.split(_sanitize_input(value).strip())
+		return [p for p in parts if p]
+
+	if all(
+		isinstance(e, str) and e and e == e.strip() and "\x00" not in e
+		for e in value
+	):
+		return value
+
+	return [_sanitize_input(cstr(e).strip()) for e in value if e and cstr(e).strip()]
+
+
+def _convert_img_srcs_to_cid(html_body: str, cid_by_url: dict[str, str]) -> str:
+	"""
+	Point the img tags of inline attachments at their content IDs.
+
+	Rewrites all inline images in one scan of the body instead of one scan
+	per attachment.
+
+	Args:
+		html_body: HTML body of the email
+		cid_by_url: Content ID per attachment file URL
+
+	Returns:
+		The HTML body with matching img sources replaced by cid: URLs
+	"""
+	if not cid_by_url:
+		return html_body
+
+	def replace(match):
+		cid = cid_by_url.get(match.group(3))
+		if not cid:
+			return match.group(0)
+		return f"{match.group(1)}{match.group(2)}cid:{cid}{match.group(2)}"
+
+	return _IMG_SRC_RE.sub(replace, html_body)
+
+
+def _prepare_mail(
 	from_email: str,
 	to: list[str],
-	cc: list[str],
-	bcc: list[str],
+	cc: list[str] | None = None,
+	bcc: list[str] | None = None,
 	subject: str | None = None,
 	html_body: str | None = None,
 	from_name: str = "",
@@ -265,31 +633,26 @@ def create_mail(
 	forwarded_from_id: str | None = None,
 	save_as_draft: bool = False,
 	scheduled_at: str | None = None,
-) -> dict:
+	trusted: bool = False,
+) -> tuple[dict, str | None]:
 	"""
-	Create and send/schedule an email with enterprise-grade validation.
+	Sanitize and validate an email and build the MailQueue._create arguments.
 
-	Args:
-		from_email: Sender email address
-		to: List of To recipients
-		cc: List of CC recipients
-		bcc: List of BCC recipients
-		subject: Email subject
-		html_body: HTML body content
-		from_name: Display name for sender
-		attachments: List of attachment dicts
-		in_reply_to: Message-ID being replied to
-		in_reply_to_id: Mail Message ID being replied to
-		forwarded_from_id: Mail Message ID being forwarded
-		save_as_draft: If True, save as draft instead of sending
-		scheduled_at: Datetime string for scheduled delivery
+	Takes the arguments of create_mail. The caller checks the user's
+	permissions first.
+
+	With `trusted`, the recipients are taken to be lists of clean, valid
+	addresses and are not normalized or format checked. The sender, size
+	and schedule checks still apply.
 
 	Returns:
-		dict with id, status, error, and scheduled_at if scheduled
-	"""
-	from mail.client.doctype.mail_queue.mail_queue import MailQueue
-	from mail.api.mail import convert_img_src_from_file_url_to_cid
+		tuple of the keyword arguments for MailQueue._create and the
+		schedule time (None unless the email is scheduled)
 
+	Raises:
+		SchedulerValidationError: If the email is invalid
+		SchedulerSecurityError: If the user may not send from `from_email`
+	"""
 	# Sanitize inputs
 	from_email = _sanitize_input(cstr(from_email).strip())
 	from_name = _sanitize_input(cstr(from_name).strip())
@@ -298,19 +661,21 @@ def create_mail(
 	scheduled_at = _sanitize_input(cstr(scheduled_at).strip()) if scheduled_at else None
 	
 	# Normalize list inputs
-	to = [_sanitize_input(cstr(e).strip()) for e in (to or []) if e]
-	cc = [_sanitize_input(cstr(e).strip()) for e in (cc or []) if e]
-	bcc = [_sanitize_input(cstr(e).strip()) for e in (bcc or []) if e]
+	if trusted:
+		to, cc, bcc = to or [], cc or [], bcc or []
+	else:
+		to = _parse_recipients(to)
+		cc = _parse_recipients(cc)
+		bcc = _parse_recipients(bcc)
 
 	# Security validations
-	_validate_user_permissions()
 	_validate_sender(from_email)
 	
 	# Input validations
-	_validate_recipients(to, cc, bcc)
+	_validate_recipients(to, cc, bcc, check_format=not trusted)
 	_validate_subject(subject)
 	_validate_body(html_body)
-	_validate_attachments(attachments)
+	doc_attachments, cid_by_url = _build_attachments(attachments)
 
 	# Schedule time validation
 	is_scheduled = bool(scheduled_at and not save_as_draft)
@@ -323,44 +688,170 @@ def create_mail(
 			"scheduled_at": scheduled_at,
 		})
 
-	# Process attachments
-	doc_attachments = []
-	for d in attachments or []:
-		cid = random_string(10)
-		doc_attachments.append({
-			"file_url": _sanitize_input(d.get("file_url", "")),
-			"blob_id": _sanitize_input(d.get("blob_id", "")),
-			"filename": _sanitize_input(d.get("file_name") or d.get("filename", "")),
-			"type": _sanitize_input(d.get("type", "")),
-			"size": cint(d.get("size", 0)),
-			"disposition": _sanitize_input(d.get("disposition")),
-			"cid": cid,
-		})
-		if d.get("disposition") == "inline" and html_body:
-			html_body = convert_img_src_from_file_url_to_cid(html_body, d.get("file_url"), cid)
+	if html_body:
+		html_body = _convert_img_srcs_to_cid(html_body, cid_by_url)
 
 	# Build recipients list
 	recipients = [{"type": "To", "email": email} for email in to]
 	recipients += [{"type": "Cc", "email": email} for email in cc]
 	recipients += [{"type": "Bcc", "email": email} for email in bcc]
 
-	# Set scheduled_at flag for monkey patch
-	if is_scheduled:
-		frappe.flags.mail_scheduler_scheduled_at = get_datetime(scheduled_at)
+	create_kwargs = {
+		"user": frappe.session.user,
+		"from_email": from_email,
+		"from_name": from_name,
+		"subject": subject,
+		"html_body": html_body,
+		"in_reply_to": in_reply_to,
+		"in_reply_to_id": in_reply_to_id,
+		"forwarded_from_id": forwarded_from_id,
+		"attachments": doc_attachments,
+		"recipients": recipients,
+		"save_as_draft": save_as_draft,
+	}
+
+	return create_kwargs, scheduled_at if is_scheduled else None
+
 
+@frappe.whitelist()
+@rate_limit(limit=60, seconds=60)  # 60 requests per minute
+def create_mail(
+	from_email: str,
+	to: list[str],
+	cc: list[str],
+	bcc: list[str],
+	subject: str | None = None,
+	html_body: str | None = None,
+	from_name: str = "",
+	attachments: list[dict] | None = None,
+	in_reply_to: str | None = None,
+	in_reply_to_id: str | None = None,
+	forwarded_from_id: str | None = None,
+	save_as_draft: bool = False,
+	scheduled_at: str | None = None,
+	run_in_background: bool = False,
+) -> dict:
+	"""
+	Create and send/schedule an email with enterprise-grade validation.
+
+	Pass `run_in_background=True` to create and submit a scheduled email in
+	a background job instead; the response then carries the job id instead
+	of the email id.
+
+	Args:
+		from_email: Sender email address
+		to: List of To recipients
+		cc: List of CC recipients
+		bcc: List of BCC recipients
+		subject: Email subject
+		html_body: HTML body content
+		from_name: Display name for sender
+		attachments: List of attachment dicts
+		in_reply_to: Message-ID being replied to
+		in_reply_to_id: Mail Message ID being replied to
+		forwarded_from_id: Mail Message ID being forwarded
+		save_as_draft: If True, save as draft instead of sending
+		scheduled_at: Datetime string for scheduled delivery
+		run_in_background: If True, create a scheduled email in a background job
+
+	Returns:
+		dict with id, status, error, and scheduled_at if scheduled
+	"""
+	return _create_mail(
+		from_email, to, cc, bcc, subject, html_body, from_name, attachments,
+		in_reply_to, in_reply_to_id, forwarded_from_id, save_as_draft, scheduled_at,
+		run_in_background=run_in_background,
+	)
+
+
+def _create_mail(
+	from_email: str,
+	to: list[str],
+	cc: list[str] | None = None,
+	bcc: list[str] | None = None,
+	subject: str | None = None,
+	html_body: str | None = None,
+	from_name: str = "",
+	attachments: list[dict] | None = None,
+	in_reply_to: str | None = None,
+	in_reply_to_id: str | None = None,
+	forwarded_from_id: str | None = None,
+	save_as_draft: bool = False,
+	scheduled_at: str | None = None,
+	run_in_background: bool = False,
+	trusted: bool = False,
+) -> dict:
+	"""
+	Create and send/schedule an email; see create_mail.
+
+	For server side callers, e.g. jobs that schedule many emails in a loop.
+	With `trusted=True` the recipient lists are not normalized or format
+	checked (see _prepare_mail). Not whitelisted, so requests can't set it.
+
+	Returns:
+		dict with id, status, error, and scheduled_at if scheduled
+	"""
+	_validate_user_permissions()
+	create_kwargs, scheduled_at = _prepare_mail(
+		from_email, to, cc, bcc, subject, html_body, from_name, attachments,
+		in_reply_to, in_reply_to_id, forwarded_from_id, save_as_draft, scheduled_at,
+		trusted=trusted,
+	)
+
+	if scheduled_at is None or not run_in_background:
+		return _create_mail_queue(create_kwargs, scheduled_at)
+
+	# Scheduled delivery is deferred anyway, so the JMAP submission does not
+	# need to hold up the web worker. The job only starts once the request
+	# has committed.
+	job_id = f"mail-scheduler-send-{frappe.generate_hash(length=16)}"
+	frappe.enqueue(
+		"mail_scheduler.tasks.send_scheduled_mail",
+		queue=_get_send_queue(),
+		job_id=job_id,
+		enqueue_after_commit=True,
+		create_kwargs=create_kwargs,
+		scheduled_at=scheduled_at,
+	)
+
+	return {
+		"id": None,
+		"status": "Queued",
+		"error": None,
+		"mail_queue_name": None,
+		"scheduled_at": str(scheduled_at),
+		"job_id": job_id,
+	}
+
+
+def _get_send_queue() -> str:
+	"""
+	Get the background queue scheduled emails are created and submitted on.
+
+	Set `mail_scheduler_queue` in the site config to give them dedicated
+	workers; defaults to DEFAULT_SEND_QUEUE.
+	"""
+	return frappe.conf.get("mail_scheduler_queue") or DEFAULT_SEND_QUEUE
+
+
+def _create_mail_queue(create_kwargs: dict, scheduled_at: str | None = None) -> dict:
+	"""
+	Create the Mail Queue for an email and submit it.
+
+	Runs inline, or as a background job for scheduled sends created with
+	`run_in_background=True`.
+
+	Args:
+		create_kwargs: Keyword arguments for MailQueue._create
+		scheduled_at: Datetime string for scheduled delivery
+
+	Returns:
+		dict with id, status, error, and scheduled_at if scheduled
+	"""
 	try:
 		doc = MailQueue._create(
-			user=frappe.session.user,
-			from_email=from_email,
-			from_name=from_name,
-			subject=subject,
-			html_body=html_body,
-			in_reply_to=in_reply_to,
-			in_reply_to_id=in_reply_to_id,
-			forwarded_from_id=forwarded_from_id,
-			attachments=doc_attachments,
-			recipients=recipients,
-			save_as_draft=save_as_draft,
+			**create_kwargs,
+			scheduled_at=_parse_datetime(scheduled_at) if scheduled_at else None,
 		)
 
 		result = {
@@ -370,11 +861,12 @@ def create_mail(
 			"mail_queue_name": doc.name,
 		}
 
-		if is_scheduled:
+		if scheduled_at:
 			result["scheduled_at"] = str(scheduled_at)
 			if doc.status == "Submitted":
 				result["status"] = "Scheduled"
-				
+
+			_invalidate_scheduled_mail_count(create_kwargs["user"])
 			_log_scheduler_event("schedule_success", {
 				"mail_queue": doc.name,
 				"email_id": doc.id,
@@ -389,9 +881,159 @@ def create_mail(
 			"scheduled_at": scheduled_at,
 		}, level="error")
 		raise
-		
-	finally:
-		frappe.flags.pop("mail_scheduler_scheduled_at", None)
+
+
+@frappe.whitelist()
+@rate_limit(limit=10, seconds=60)
+def create_mail_batch(messages: list[dict], wait: bool = False) -> dict:
+	"""
+	Create and send/schedule several emails in one call.
+
+	Every message is validated before any of them is created. Scheduled
+	messages are then created in a single background job (or inline with
+	`wait=True`), the others inline.
+
+	The results of a queued batch are stored when its job finishes and can
+	be looked up with get_mail_batch_results for MAIL_BATCH_RESULT_TTL
+	seconds. If the job itself fails, e.g. on a timeout, only that failure
+	is stored: the emails it got to before may already be submitted.
+
+	Args:
+		messages: Up to MAX_BATCH_SIZE dicts of create_mail arguments
+		wait: If True, create scheduled emails inline instead of in a background job
+
+	Returns:
+		dict with the result of each message, in order, and the batch and
+		job ids when scheduled messages were queued
+
+	Raises:
+		SchedulerValidationError: If the batch or any message is invalid
+	"""
+	_validate_user_permissions()
+
+	if isinstance(messages, str):
+		messages = frappe.parse_json(messages)
+	if not messages:
+		raise SchedulerValidationError(_("No emails given"))
+	if len(messages) > MAX_BATCH_SIZE:
+		raise SchedulerValidationError(
+			_("Too many emails. Maximum allowed: {0}").format(MAX_BATCH_SIZE)
+		)
+
+	prepared = []
+	for i, message in enumerate(messages):
+		if not isinstance(message, dict):
+			raise SchedulerValidationError(_("Email {0} is not an object").format(i + 1))
+		if not message.get("from_email") or not message.get("to"):
+			raise SchedulerValidationError(_("Email {0} needs a sender and recipients").format(i + 1))
+		prepared.append(_prepare_mail(**{k: v for k, v in message.items() if k in _CREATE_MAIL_ARGS}))
+
+	results = [None] * len(prepared)
+	scheduled = []
+	for i, (create_kwargs, scheduled_at) in enumerate(prepared):
+		if scheduled_at is None:
+			results[i] = _create_mail_queue(create_kwargs)
+		else:
+			scheduled.append((i, create_kwargs, scheduled_at))
+
+	batch_id = job_id = None
+	if scheduled and wait:
+		for i, result in zip(
+			(i for i, _kwargs, _at in scheduled),
+			_create_mail_queues([(kwargs, at) for _i, kwargs, at in scheduled]),
+		):
+			results[i] = result
+	elif scheduled:
+		batch_id = frappe.generate_hash(length=16)
+		job_id = f"mail-scheduler-batch-{batch_id}"
+		# Lookups report the batch as queued once the job can start
+		frappe.db.after_commit.add(partial(_store_mail_batch_results, batch_id, "Queued"))
+		frappe.enqueue(
+			"mail_scheduler.tasks.send_scheduled_mails",
+			queue=_get_send_queue(),
+			job_id=job_id,
+			enqueue_after_commit=True,
+			items=[(kwargs, at) for _i, kwargs, at in scheduled],
+			batch_id=batch_id,
+		)
+		for i, _kwargs, scheduled_at in scheduled:
+			results[i] = {
+				"id": None,
+				"status": "Queued",
+				"error": None,
+				"mail_queue_name": None,
+				"scheduled_at": str(scheduled_at),
+			}
+
+	return {"results": results, "batch_id": batch_id, "job_id": job_id}
+
+
+@frappe.whitelist()
+def get_mail_batch_results(batch_id: str) -> dict:
+	"""
+	Get the results of the scheduled emails a create_mail_batch call queued.
+
+	Args:
+		batch_id: batch_id returned by create_mail_batch
+
+	Returns:
+		dict with the status of the batch ("Queued", "Done" or "Failed"),
+		the result of each queued email, in order, once it is done, and the
+		error if the job failed
+
+	Raises:
+		SchedulerValidationError: If the batch is unknown or its results expired
+		SchedulerSecurityError: If the batch was queued by another user
+	"""
+	batch_id = _sanitize_input(cstr(batch_id).strip())
+	batch = frappe.cache().get_value(f"{MAIL_BATCH_CACHE_KEY}|{batch_id}")
+	if not batch:
+		raise SchedulerValidationError(_("Email batch not found"))
+
+	user = frappe.session.user
+	if batch["user"] != user and not _is_system_manager(user):
+		raise SchedulerSecurityError(_("You do not have permission to access this email batch"))
+
+	return {"status": batch["status"], "results": batch["results"], "error": batch["error"]}
+
+
+def _store_mail_batch_results(
+	batch_id: str, status: str, results: list[dict] | None = None, error: str | None = None
+) -> None:
+	"""Store the status and results of a queued create_mail_batch batch."""
+	frappe.cache().set_value(
+		f"{MAIL_BATCH_CACHE_KEY}|{batch_id}",
+		{"user": frappe.session.user, "status": status, "results": results, "error": error},
+		expires_in_sec=MAIL_BATCH_RESULT_TTL,
+	)
+
+
+def _create_mail_queues(items: list[tuple[dict, str]]) -> list[dict]:
+	"""
+	Create and submit the Mail Queues of a batch of scheduled emails.
+
+	A failing email does not stop the rest of the batch; its result carries
+	the error instead.
+
+	Args:
+		items: MailQueue._create arguments and schedule time per email
+
+	Returns:
+		list of results, in the order of `items`
+	"""
+	results = []
+	for create_kwargs, scheduled_at in items:
+		try:
+			results.append(_create_mail_queue(create_kwargs, scheduled_at))
+		except Exception as e:
+			results.append({
+				"id": None,
+				"status": "Error",
+				"error": str(e),
+				"mail_queue_name": None,
+				"scheduled_at": str(scheduled_at),
+			})
+	return results
 
 
 @frappe.whitelist()
@@ -428,9 +1070,6 @@ def update_draft_mail(
 	Returns:
 		dict with id, status, error, and scheduled_at if scheduled
 	"""
-	from mail.utils import convert_html_to_text
-	from mail.api.mail import convert_img_src_from_base64_to_cid, convert_img_src_from_file_url_to_cid
-
 	# Sanitize inputs
 	id = _sanitize_input(cstr(id).strip())
 	from_email = _sanitize_input(cstr(from_email).strip())
@@ -439,9 +1078,9 @@ def update_draft_mail(
 	html_body = _sanitize_input(html_body) if html_body else None
 	scheduled_at = _sanitize_input(cstr(scheduled_at).strip()) if scheduled_at else None
 	
-	to = [_sanitize_input(cstr(e).strip()) for e in (to or []) if e]
-	cc = [_sanitize_input(cstr(e).strip()) for e in (cc or []) if e]
-	bcc = [_sanitize_input(cstr(e).strip()) for e in (bcc or []) if e]
+	to = _parse_recipients(to)
+	cc = _parse_recipients(cc)
+	bcc = _parse_recipients(bcc)
 
 	# Security validations
 	_validate_user_permissions()
@@ -451,12 +1090,11 @@ def update_draft_mail(
 	_validate_recipients(to, cc, bcc)
 	_validate_subject(subject)
 	_validate_body(html_body)
-	_validate_attachments(attachments)
+	doc_attachments, cid_by_url = _build_attachments(attachments, keep_cids=True)
 
 	# Schedule time validation
 	is_scheduled = bool(scheduled_at and submit)
-	if is_scheduled:
-		_validate_schedule_time(scheduled_at)
+	schedule_dt = _validate_schedule_time(scheduled_at) if is_scheduled else None
 
 	# Get and validate the draft document
 	try:
@@ -466,67 +1104,45 @@ def update_draft_mail(
 	
 	doc.check_permission(permtype="write")
 
-	# Update fields
-	doc.from_email = from_email
-	doc.from_name = from_name
-	doc.subject = subject
-
-	# Process attachments
-	doc.attachments = []
-	for d in attachments or []:
-		cid = d.get("cid", random_string(10))
-		doc.append(
-			"attachments",
-			{
-				"blob_id": _sanitize_input(d.get("blob_id", "")),
-				"file_url": _sanitize_input(d.get("file_url", "")),
-				"type": _sanitize_input(d.get("type", "")),
-				"size": cint(d.get("size", 0)),
-				"filename": _sanitize_input(d.get("filename", "")),
-				"disposition": _sanitize_input(d.get("disposition")),
-				"cid": cid,
-			},
-		)
-		if d.get("disposition") == "inline" and html_body:
-			html_body = convert_img_src_from_file_url_to_cid(html_body, d.get("file_url"), cid)
-
-	doc.html_body = convert_img_src_from_base64_to_cid(html_body) if html_body else None
-	doc.text_body = convert_html_to_text(doc.html_body) if doc.html_body else None
-
-	# Update recipients
-	doc.recipients = []
-	for email in to:
-		doc.append("recipients", {"type": "To", "email": email})
-	for email in cc:
-		doc.append("recipients", {"type": "Cc", "email": email})
-	for email in bcc:
-		doc.append("recipients", {"type": "Bcc", "email": email})
-
-	# Set scheduled_at flag
-	if is_scheduled:
-		frappe.flags.mail_scheduler_scheduled_at = get_datetime(scheduled_at)
+	doc.set("attachments", doc_attachments)
+	if html_body:
+		html_body = _convert_img_srcs_to_cid(html_body, cid_by_url)
+
+	# Update fields in one pass
+	html_body = convert_img_src_from_base64_to_cid(html_body) if html_body else None
+	doc.update({
+		"from_email": from_email,
+		"from_name": from_name,
+		"subject": subject,
+		"html_body": html_body,
+		"text_body": convert_html_to_text(html_body) if html_body else None,
+	})
 
-	try:
+	# Update recipients; Mail Message is stored over JMAP, so the rows only
+	# need to be on the document, there are no child-table inserts to batch
+	recipients = [{"type": "To", "email": email} for email in to]
+	recipients += [{"type": "Cc", "email": email} for email in cc]
+	recipients += [{"type": "Bcc", "email": email} for email in bcc]
+	doc.set("recipients", recipients)
+
+	with scheduled_send(schedule_dt):
 		if submit:
 			new_doc = doc.submit()
 		else:
 			new_doc = doc.save_draft()
 
-		result = {
-			"id": new_doc.id,
-			"status": new_doc.status,
-			"error": new_doc.error_message,
-		}
+	result = {
+		"id": new_doc.id,
+		"status": new_doc.status,
+		"error": new_doc.error_message,
+	}
 
-		if is_scheduled:
-			result["scheduled_at"] = str(scheduled_at)
-			if new_doc.status == "Submitted":
-				result["status"] = "Scheduled"
+	if is_scheduled:
+		result["scheduled_at"] = str(scheduled_at)
+		if new_doc.status == "Submitted":
+			result["status"] = "Scheduled"
 
-		return result
-		
-	finally:
-		frappe.flags.pop("mail_scheduler_scheduled_at", None)
+	return result
 
 
 @frappe.whitelist()
@@ -544,31 +1160,19 @@ def cancel_scheduled_mail(mail_queue_name: str) -> dict:
 	mail_queue_name = _sanitize_input(cstr(mail_queue_name).strip())
 	
 	_validate_user_permissions()
-	
-	try:
-		doc = frappe.get_doc("Mail Queue", mail_queue_name)
-	except frappe.DoesNotExistError:
-		raise SchedulerValidationError(_("Scheduled email not found"))
-	
-	doc.check_permission(permtype="write")
-
-	# Verify ownership
-	if doc.user != frappe.session.user:
-		is_admin = "System Manager" in frappe.get_roles(frappe.session.user)
-		if not is_admin:
-			raise SchedulerSecurityError(_("You do not have permission to cancel this email"))
+	mail_queue = _load_mail_queue_meta(mail_queue_name)
 
 	# Check if email is actually scheduled
-	scheduled_at = doc.get("scheduled_at")
+	scheduled_at = mail_queue.scheduled_at
 	if not scheduled_at:
 		raise SchedulerValidationError(_("This email is not scheduled"))
 
 	# Check if already sent
-	if doc.status in ["Sent", "Delivered"]:
+	if mail_queue.status in ["Sent", "Delivered"]:
 		raise SchedulerValidationError(_("Cannot cancel an email that has already been sent"))
 
 	# Check if past schedule time
-	if get_datetime(scheduled_at) <= now_datetime():
+	if _parse_datetime(scheduled_at) <= now_datetime():
 		raise SchedulerValidationError(_("Cannot cancel an email past its scheduled time"))
 
 	_log_scheduler_event("cancel_attempt", {
@@ -577,13 +1181,12 @@ def cancel_scheduled_mail(mail_queue_name: str) -> dict:
 	})
 
 	# Try to cancel via JMAP
-	submission_id = doc.get("submission_id")
+	submission_id = mail_queue.submission_id
 	jmap_cancelled = False
 	
 	if submission_id:
 		try:
-			from mail_scheduler.jmap.futurerelease import email_submission_cancel
-			email_submission_cancel(doc.user, submission_id)
+			email_submissions_cancel(mail_queue.user, [submission_id])
 			jmap_cancelled = True
 		except Exception as e:
 			frappe.log_error(
@@ -591,13 +1194,14 @@ def cancel_scheduled_mail(mail_queue_name: str) -> dict:
 				title="Mail Scheduler JMAP Cancel Error"
 			)
 
-	# Update the document
-	doc.db_set({
+	# Update the record
+	frappe.db.set_value("Mail Queue", mail_queue_name, {
 		"status": "Cancelled",
 		"scheduled_at": None,
 		"submission_id": None,
 		"error_message": "Cancelled by user",
 	})
+	_invalidate_scheduled_mail_count(mail_queue.user)
 
 	_log_scheduler_event("cancel_success", {
 		"mail_queue": mail_queue_name,
@@ -611,6 +1215,112 @@ def cancel_scheduled_mail(mail_queue_name: str) -> dict:
 	}
 
 
+@frappe.whitelist()
+@rate_limit(limit=10, seconds=60)
+def cancel_scheduled_mails(mail_queue_names: list[str]) -> dict:
+	"""
+	Cancel several scheduled emails at once.
+
+	Ownership and state are validated with one query, and the JMAP
+	submissions of each user are cancelled in a single request.
+
+	Args:
+		mail_queue_names: Names of the Mail Queue documents (max MAX_BATCH_SIZE)
+
+	Returns:
+		dict with the cancelled names, the names cancelled on the server
+		and the names that were skipped with the reason
+	"""
+	_validate_user_permissions()
+
+	if isinstance(mail_queue_names, str):
+		mail_queue_names = frappe.parse_json(mail_queue_names)
+
+	names = list(dict.fromkeys(
+		_sanitize_input(cstr(name).strip()) for name in (mail_queue_names or []) if name
+	))
+	if not names:
+		raise SchedulerValidationError(_("No scheduled emails given"))
+	if len(names) > MAX_BATCH_SIZE:
+		raise SchedulerValidationError(
+			_("Too many emails. Maximum allowed: {0}").format(MAX_BATCH_SIZE)
+		)
+	user = frappe.session.user
+	is_admin = _is_system_manager(user)
+	rows = frappe.get_all(
+		"Mail Queue",
+		filters={"name": ["in", names]},
+		fields=["name", "user", "status", "scheduled_at", "submission_id"],
+	)
+	rows_by_name = {row.name: row for row in rows}
+
+	now = now_datetime()
+	skipped = {}
+	cancellable = []
+	for name in names:
+		row = rows_by_name.get(name)
+		if not row or (row.user != user and not is_admin):
+			skipped[name] = _("Scheduled email not found")
+		elif not row.scheduled_at:
+			skipped[name] = _("This email is not scheduled")
+		elif row.status in ["Sent", "Delivered"]:
+			skipped[name] = _("Cannot cancel an email that has already been sent")
+		elif get_datetime(row.scheduled_at) <= now:
+			skipped[name] = _("Cannot cancel an email past its scheduled time")
+		else:
+			cancellable.append(row)
+
+	_log_scheduler_event("bulk_cancel_attempt", {
+		"mail_queues": [row.name for row in cancellable],
+		"skipped": list(skipped),
+	})
+
+	# One JMAP request per user, covering all of their submissions
+	submissions_by_user = {}
+	for row in cancellable:
+		if row.submission_id:
+			submissions_by_user.setdefault(row.user, {})[row.submission_id] = row.name
+
+	responses = email_submissions_cancel_many({
+		owner: list(submissions) for owner, submissions in submissions_by_user.items()
+	})
+
+	jmap_cancelled = []
+	for owner, submissions in submissions_by_user.items():
+		try:
+			response = responses[owner]
+			if isinstance(response, Exception):
+				raise response
+			updated = response.get("methodResponses", [[]])[0][1].get("updated") or {}
+			jmap_cancelled += [submissions[sid] for sid in updated if sid in submissions]
+		except Exception as e:
+			frappe.log_error(
+				message=f"Failed to cancel JMAP submissions of {owner}: {e}",
+				title="Mail Scheduler JMAP Cancel Error"
+			)
+
+	_bulk_set_mail_queue_status([row.name for row in cancellable], "Cancelled", {
+		"scheduled_at": None,
+		"submission_id": None,
+		"error_message": "Cancelled by user",
+	})
+
+	for owner in {row.user for row in cancellable}:
+		_invalidate_scheduled_mail_count(owner)
+
+	_log_scheduler_event("bulk_cancel_success", {
+		"mail_queues": [row.name for row in cancellable],
+		"jmap_cancelled": jmap_cancelled,
+	})
+
+	return {
+		"success": True,
+		"cancelled": [row.name for row in cancellable],
+		"jmap_cancelled": jmap_cancelled,
+		"skipped": skipped,
+	}
+
+
 @frappe.whitelist()
 @rate_limit(limit=30, seconds=60)
 def reschedule_mail(mail_queue_name: str, new_scheduled_at: str) -> dict:
@@ -628,28 +1338,17 @@ def reschedule_mail(mail_queue_name: str, new_scheduled_at: str) -> dict:
 	new_scheduled_at = _sanitize_input(cstr(new_scheduled_at).strip())
 	
 	_validate_user_permissions()
-	_validate_schedule_time(new_scheduled_at)
-
-	try:
-		doc = frappe.get_doc("Mail Queue", mail_queue_name)
-	except frappe.DoesNotExistError:
-		raise SchedulerValidationError(_("Scheduled email not found"))
-	
-	doc.check_permission(permtype="write")
-
-	# Verify ownership
-	if doc.user != frappe.session.user:
-		is_admin = "System Manager" in frappe.get_roles(frappe.session.user)
-		if not is_admin:
-			raise SchedulerSecurityError(_("You do not have permission to reschedule this email"))
+	new_dt = _validate_schedule_time(new_scheduled_at)
+	mail_queue = _load_mail_queue_meta(mail_queue_name)
+	_lock_mail_queue(mail_queue_name, mail_queue)
 
 	# Check if email is actually scheduled
-	old_scheduled_at = doc.get("scheduled_at")
+	old_scheduled_at = mail_queue.scheduled_at
 	if not old_scheduled_at:
 		raise SchedulerValidationError(_("This email is not scheduled"))
 
 	# Check if already sent
-	if doc.status in ["Sent", "Delivered"]:
+	if mail_queue.status in ["Sent", "Delivered"]:
 		raise SchedulerValidationError(_("Cannot reschedule an email that has already been sent"))
 
 	_log_scheduler_event("reschedule_attempt", {
@@ -658,23 +1357,29 @@ def reschedule_mail(mail_queue_name: str, new_scheduled_at: str) -> dict:
 		"new_scheduled_at": new_scheduled_at,
 	})
 
-	# Cancel existing submission
-	submission_id = doc.get("submission_id")
+	# The existing submission is cancelled in the same EmailSubmission/set
+	# call that creates the new one; see the finally block for the fallback
+	submission_id = mail_queue.submission_id
 	if submission_id:
-		try:
-			from mail_scheduler.jmap.futurerelease import email_submission_cancel
-			email_submission_cancel(doc.user, submission_id)
-		except Exception:
-			pass  # Continue even if cancel fails
+		frappe.flags.mail_scheduler_cancel_submission_ids = [submission_id]
 
-	# Update scheduled time and reprocess
-	new_dt = get_datetime(new_scheduled_at)
-	doc.db_set("scheduled_at", new_dt)
+	# Resubmission goes through the document controller, which needs the
+	# full document
+	doc = frappe.get_doc("Mail Queue", mail_queue_name)
+	doc.scheduled_at = new_dt
 
-	# Set flag and reprocess
-	frappe.flags.mail_scheduler_scheduled_at = new_dt
 	try:
-		doc._process()
+		frappe.flags.pop("mail_scheduler_submission_id", None)
+		with scheduled_send(new_dt):
+			doc._process()
+
+		# New time and replacing submission in one column write
+		values = {"scheduled_at": new_dt}
+		if new_submission_id := frappe.flags.pop("mail_scheduler_submission_id", None):
+			values["submission_id"] = new_submission_id
+		frappe.db.set_value("Mail Queue", mail_queue_name, values)
+		_invalidate_scheduled_mail_count(mail_queue.user)
+		invalidate_next_due()
 		
 		_log_scheduler_event("reschedule_success", {
 			"mail_queue": mail_queue_name,
@@ -682,7 +1387,12 @@ def reschedule_mail(mail_queue_name: str, new_scheduled_at: str) -> dict:
 		})
 		
 	finally:
-		frappe.flags.pop("mail_scheduler_scheduled_at", None)
+		# Not consumed by the scheduled submission, cancel on its own
+		if frappe.flags.pop("mail_scheduler_cancel_submission_ids", None):
+			try:
+				email_submissions_cancel(mail_queue.user, [submission_id])
+			except Exception:
+				pass  # Continue even if cancel fails
 
 	return {
 		"success": True,
@@ -696,51 +1406,89 @@ def get_scheduled_mails(
 	page_length: int = 20,
 	start: int = 0,
 	status: str | None = None,
-) -> list[dict]:
+	after_scheduled_at: str | None = None,
+	after_name: str | None = None,
+	include_total: bool = False,
+	fields: list[str] | None = None,
+) -> dict:
 	"""
 	Get list of scheduled emails for the current user.
 
+	Results are ordered by (scheduled_at, name) and paginated with a keyset
+	cursor: pass the `next_cursor` of the previous page as `after_scheduled_at`
+	and `after_name` to fetch the next one. Unlike `start`, the cursor turns
+	into an index seek, so deep pages cost the same as the first page.
+
 	Args:
-		page_length: Number of results to return (max 100)
-		start: Offset for pagination
+		page_length: Number of results to return (max MAX_PAGE_LENGTH)
+		start: Offset for pagination, at most MAX_PAGE_OFFSET (ignored when a
+			cursor is given)
 		status: Filter by status
+		after_scheduled_at: scheduled_at of the last row of the previous page
+		after_name: name of the last row of the previous page
+		include_total: If True, also return the (cached) total count
+		fields: Columns to return, out of SCHEDULED_MAIL_FIELDS; defaults to
+			DEFAULT_SCHEDULED_MAIL_FIELDS. name and scheduled_at are always
+			included for the cursor; recipients also adds to/cc/bcc lists.
 
 	Returns:
-		List of scheduled email dicts
+		dict with the scheduled email dicts, the cursor for the next page
+		and the total count if requested
 	"""
 	_validate_user_permissions()
-	
+
 	# Sanitize and limit pagination
-	page_length = min(cint(page_length) or 20, 100)
-	start = max(cint(start) or 0, 0)
-	
-	filters = {
-		"user": frappe.session.user,
-		"scheduled_at": ["is", "set"],
-	}
+	page_length = min(cint(page_length) or 20, MAX_PAGE_LENGTH)
+	start = _validate_page_offset(start)
+
+	if isinstance(fields, str):
+		fields = frappe.parse_json(fields)
+	requested = set(fields or DEFAULT_SCHEDULED_MAIL_FIELDS) | {"name", "scheduled_at"}
+	# recipients live in a child table and are batch loaded below
+	select_fields = [
+		field for field in SCHEDULED_MAIL_FIELDS if field in requested and field != "recipients"
+	]
+
+	MailQueueTable = frappe.qb.DocType("Mail Queue")
+	query = (
+		frappe.qb.from_(MailQueueTable)
+		.select(*select_fields)
+		.where(MailQueueTable.user == frappe.session.user)
+		.where(MailQueueTable.scheduled_at.isnotnull())
+		.orderby(MailQueueTable.scheduled_at)
+		.orderby(MailQueueTable.name)
+		.limit(page_length)
+	)
 
+	status = _sanitize_input(cstr(status)) if status else None
 	if status:
-		filters["status"] = _sanitize_input(cstr(status))
+		query = query.where(MailQueueTable.status == status)
+
+	if after_scheduled_at and after_name:
+		after_dt = _parse_datetime(_sanitize_input(cstr(after_scheduled_at)))
+		after_name = _sanitize_input(cstr(after_name))
+		query = query.where(
+			(MailQueueTable.scheduled_at > after_dt)
+			| ((MailQueueTable.scheduled_at == after_dt) & (MailQueueTable.name > after_name))
+		)
+	elif start:
+		query = query.offset(start)
 
-	scheduled_mails = frappe.get_all(
-		"Mail Queue",
-		filters=filters,
-		fields=[
-			"name",
-			"subject",
-			"from_email",
-			"scheduled_at",
-			"status",
-			"creation",
-		],
-		order_by="scheduled_at asc",
-		start=start,
-		page_length=page_length,
-	)
+	scheduled_mails = query.run(as_dict=True)
+	if "recipients" in requested:
+		_attach_recipients(scheduled_mails)
+
+	next_cursor = None
+	if len(scheduled_mails) == page_length:
+		last = scheduled_mails[-1]
+		next_cursor = {"scheduled_at": str(last.scheduled_at), "name": last.name}
 
-	return scheduled_mails
+	result = {
+		"mails": scheduled_mails,
+		"next_cursor": next_cursor,
+	}
 
+	if include_total:
+		result["total"] = _get_scheduled_mail_count(frappe.session.user, status)
 
-def get_max_schedule_days() -> int:
-	"""Get the maximum number of days an email can be scheduled in advance."""
-	return MAX_SCHEDULE_DAYS
+	return result
@@ -9,9 +9,23 @@ security, validation, and error handling.
 import frappe
 from frappe import _
 from frappe.utils import get_datetime, now_datetime, cint, cstr
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Count, Sum
 from frappe.rate_limiter import rate_limit
+from collections import defaultdict
+import hashlib
+import json
 from typing import Any
 
+from werkzeug.wrappers import Response
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - orjson ships with frappe
+	orjson = None
+
+from mail_scheduler.jmap.futurerelease import email_submissions_cancel, get_max_schedule_days
+from mail_scheduler.utils import invalidate_next_due
 
 # Import validation helpers from mail module
 from mail_scheduler.api.mail import (
@@ -21,8 +35,44 @@ from mail_scheduler.api.mail import (
 	_validate_schedule_time,
 	_sanitize_input,
 	_log_scheduler_event,
-	MAX_SCHEDULE_DAYS,
+	_validate_page_offset,
+	_bulk_set_mail_queue_status,
+	_get_scheduled_mail_count,
+	_invalidate_scheduled_mail_count,
+	_is_system_manager,
+	MIN_SCHEDULE_MINUTES,
+	MAX_RECIPIENTS,
+	MAX_ATTACHMENTS,
+	MAX_ATTACHMENT_SIZE_MB,
+	MAX_PAGE_LENGTH,
+	MAX_BATCH_SIZE,
+)
+
+SCHEDULER_CONFIG = {
+	"enabled": True,
+	"min_schedule_minutes": MIN_SCHEDULE_MINUTES,
+	"max_recipients": MAX_RECIPIENTS,
+	"max_attachments": MAX_ATTACHMENTS,
+	"max_attachment_size_mb": MAX_ATTACHMENT_SIZE_MB,
+}
+SCHEDULER_CONFIG_MAX_AGE = 300  # seconds
+BULK_CANCEL_SYNC_LIMIT = 20  # larger batches are cancelled in a background job
+
+STREAM_CHUNK_SIZE = 500
+
+_LIST_FIELDS = (
+	"name",
+	"id",
+	"from_email",
+	"from_name",
+	"subject",
+	"scheduled_at",
+	"creation",
+	"status",
+	"error_message",
 )
+_ALLOWED_SORT_FIELDS = frozenset(("scheduled_at", "creation", "subject", "from_email"))
+_ALLOWED_STATUSES = frozenset(("Submitted", "Cancelled", "Sent", "Delivered", "Failed"))
 
 
 def _get_logger():
@@ -41,11 +91,179 @@ def _validate_ownership(doc, allow_admin: bool = True) -> None:
 	user = frappe.session.user
 	
 	if doc.user != user:
-		if allow_admin and "System Manager" in frappe.get_roles(user):
+		if allow_admin and _is_system_manager(user):
 			return
 		raise SchedulerSecurityError(_("You do not have permission to access this email"))
 
 
+def _find_user_mail_queue(email_id: str, fields: list[str]) -> dict | None:
+	"""
+	Find a Mail Queue of the current user by JMAP email ID or by name.
+
+	Both are matched in one query; a match on the email ID wins.
+
+	Args:
+		email_id: The JMAP email ID or Mail Queue name
+		fields: Columns to fetch
+
+	Returns:
+		The matching row, or None
+	"""
+	rows = frappe.get_all(
+		"Mail Queue",
+		filters={"user": frappe.session.user},
+		or_filters={"id": email_id, "name": email_id},
+		fields=list(dict.fromkeys(["id", *fields])),
+		limit=2,
+	)
+	for row in rows:
+		if row.id == email_id:
+			return row
+
+	return rows[0] if rows else None
+
+
+def _get_cancel_error(mail_queue: dict, now) -> str | None:
+	"""
+	Check whether a scheduled email can still be cancelled.
+
+	Args:
+		mail_queue: Mail Queue row with scheduled_at and status
+		now: Current datetime
+
+	Returns:
+		The reason it cannot be cancelled, or None
+	"""
+	if not mail_queue.scheduled_at:
+		return _("This email is not scheduled")
+	
+	if mail_queue.status in ["Sent", "Delivered"]:
+		return _("Cannot cancel an email that has already been sent")
+	
+	if mail_queue.status == "Cancelled":
+		return _("This email is already cancelled")
+	
+	# Past schedule time, with a 30 second grace period
+	delta = (now - get_datetime(mail_queue.scheduled_at)).total_seconds()
+	if delta > 30:
+		return _("Cannot cancel an email past its scheduled time")
+
+	return None
+
+
+def _attach_children(emails: list[dict], include_attachments: bool = False) -> None:
+	"""
+	Load recipients (and optionally attachments) of a page of emails.
+
+	Runs one query per child table, whatever the number of emails.
+
+	Args:
+		emails: Mail Queue rows, each with a name
+		include_attachments: If True, also attach the attachments
+	"""
+	if not emails:
+		return
+
+	email_names = [e.name for e in emails]
+	
+	recipients_map = defaultdict(list)
+	for r in frappe.get_all(
+		"Mail Queue Recipient",
+		filters={"parent": ["in", email_names]},
+		fields=["parent", "email", "type"],
+	):
+		recipients_map[r.parent].append(r)
+
+	attachments_map = defaultdict(list)
+	if include_attachments:
+		for a in frappe.get_all(
+			"Mail Queue Attachment",
+			filters={"parent": ["in", email_names]},
+			fields=["parent", "filename", "type", "size"],
+		):
+			attachments_map[a.parent].append(a)
+	
+	for email in emails:
+		email_recipients = recipients_map[email.name]
+		buckets = defaultdict(list)
+		for r in email_recipients:
+			buckets[r["type"]].append(r["email"])
+		email["recipients"] = email_recipients
+		email["to"] = buckets["To"]
+		email["cc"] = buckets["Cc"]
+		email["recipient_count"] = len(email_recipients)
+		if include_attachments:
+			email["attachments"] = attachments_map[email.name]
+
+
+def _dump_ndjson(rows: list[dict]) -> bytes:
+	"""
+	Serialize rows as newline delimited JSON.
+
+	Uses orjson when available; datetimes are passed to str() either way so
+	both paths produce the same output as frappe's JSON responses.
+	"""
+	if orjson is None:
+		return "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+	option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+	return b"".join(orjson.dumps(row, default=str, option=option) for row in rows)
+
+
+def _stream_scheduled_emails(user: str, status: str | None, include_attachments: bool) -> Response:
+	"""
+	Export all scheduled emails of a user as newline delimited JSON.
+
+	Rows are read in STREAM_CHUNK_SIZE keyset pages on (scheduled_at, name)
+	and serialized per chunk, so only one chunk of row dicts is alive at a
+	time. The body is assembled before returning because the database
+	connection is closed once the request handler returns.
+
+	Args:
+		user: User whose emails are exported
+		status: Optional status filter
+		include_attachments: If True, also export the attachments
+
+	Returns:
+		NDJSON response, one email per line
+	"""
+	MailQueue = frappe.qb.DocType("Mail Queue")
+	base_query = (
+		frappe.qb.from_(MailQueue)
+		.select(*_LIST_FIELDS)
+		.where(MailQueue.user == user)
+		.where(MailQueue.scheduled_at.isnotnull())
+		.orderby(MailQueue.scheduled_at)
+		.orderby(MailQueue.name)
+		.limit(STREAM_CHUNK_SIZE)
+	)
+	if status:
+		base_query = base_query.where(MailQueue.status == status)
+
+	chunks = []
+	last = None
+	while True:
+		query = base_query
+		if last:
+			query = query.where(
+				(MailQueue.scheduled_at > last.scheduled_at)
+				| ((MailQueue.scheduled_at == last.scheduled_at) & (MailQueue.name > last.name))
+			)
+
+		emails = query.run(as_dict=True)
+		if not emails:
+			break
+
+		_attach_children(emails, include_attachments)
+		chunks.append(_dump_ndjson(emails))
+
+		if len(emails) < STREAM_CHUNK_SIZE:
+			break
+		last = emails[-1]
+
+	return Response(chunks, mimetype="application/x-ndjson")
+
+
 @frappe.whitelist()
 @rate_limit(limit=120, seconds=60)
 def get_scheduled_emails(
@@ -54,31 +272,39 @@ def get_scheduled_emails(
 	status: str | None = None,
 	sort_by: str = "scheduled_at",
 	sort_order: str = "asc",
+	include_attachments: bool = False,
+	stream: bool = False,
 ) -> dict:
 	"""
 	Get list of scheduled emails for the current user.
 	
+	With `stream=True` all matching emails are returned instead of a page,
+	as newline delimited JSON ordered by scheduled_at; limit, offset and
+	sort are ignored.
+	
 	Args:
-		limit: Maximum number of emails to return (max 100)
-		offset: Offset for pagination
+		limit: Maximum number of emails to return (max MAX_PAGE_LENGTH)
+		offset: Offset for pagination (max MAX_PAGE_OFFSET)
 		status: Filter by status (Submitted, Cancelled, etc.)
 		sort_by: Field to sort by (scheduled_at, creation, subject)
 		sort_order: Sort order (asc, desc)
+		include_attachments: If True, also return the attachments of each email
+		stream: If True, return every email as NDJSON instead of a page
 		
 	Returns:
-		dict with emails list, total count, and pagination info
+		dict with emails list, total count, and pagination info, or an
+		NDJSON response when streaming
 	"""
 	_validate_user_permissions()
 	
 	user = frappe.session.user
 	
 	# Sanitize and validate pagination
-	limit = min(max(cint(limit) or 20, 1), 100)
-	offset = max(cint(offset) or 0, 0)
+	limit = min(max(cint(limit) or 20, 1), MAX_PAGE_LENGTH)
+	offset = _validate_page_offset(offset)
 	
 	# Validate sort parameters
-	allowed_sort_fields = ["scheduled_at", "creation", "subject", "from_email"]
-	sort_by = sort_by if sort_by in allowed_sort_fields else "scheduled_at"
+	sort_by = sort_by if sort_by in _ALLOWED_SORT_FIELDS else "scheduled_at"
 	sort_order = "desc" if sort_order.lower() == "desc" else "asc"
 	
 	# Build filters
@@ -89,64 +315,39 @@ def get_scheduled_emails(
 	
 	if status:
 		status = _sanitize_input(cstr(status).strip())
-		if status in ["Submitted", "Cancelled", "Sent", "Delivered", "Failed"]:
+		if status in _ALLOWED_STATUSES:
 			filters["status"] = status
 	
+	if cint(stream):
+		return _stream_scheduled_emails(user, filters.get("status"), cint(include_attachments))
+	
 	try:
 		# Get emails
 		emails = frappe.get_all(
 			"Mail Queue",
 			filters=filters,
-			fields=[
-				"name",
-				"id",
-				"from_email",
-				"from_name",
-				"subject",
-				"scheduled_at",
-				"creation",
-				"status",
-				"error_message",
-			],
+			fields=list(_LIST_FIELDS),
 			order_by=f"{sort_by} {sort_order}",
-			limit=limit,
+			limit=limit + 1,
 			start=offset,
 		)
+
+		# The extra row only tells whether another page exists
+		has_more = len(emails) > limit
+		emails = emails[:limit]
 		
-		# Get recipients for each email (batched for efficiency)
-		if emails:
-			email_names = [e.name for e in emails]
-			
-			all_recipients = frappe.get_all(
-				"Mail Queue Recipient",
-				filters={"parent": ["in", email_names]},
-				fields=["parent", "email", "type"],
-			)
-			
-			# Group recipients by parent
-			recipients_map = {}
-			for r in all_recipients:
-				if r.parent not in recipients_map:
-					recipients_map[r.parent] = []
-				recipients_map[r.parent].append(r)
-			
-			# Attach recipients to emails
-			for email in emails:
-				email_recipients = recipients_map.get(email.name, [])
-				email["recipients"] = email_recipients
-				email["to"] = [r["email"] for r in email_recipients if r["type"] == "To"]
-				email["cc"] = [r["email"] for r in email_recipients if r["type"] == "Cc"]
-				email["recipient_count"] = len(email_recipients)
+		# Get recipients (and attachments) for the whole page, one query each
+		_attach_children(emails, cint(include_attachments))
 		
-		# Get total count
-		total = frappe.db.count("Mail Queue", filters)
+		# Total count, cached per user and status
+		total = _get_scheduled_mail_count(user, filters.get("status"))
 		
 		return {
 			"emails": emails,
 			"total": total,
 			"limit": limit,
 			"offset": offset,
-			"has_more": offset + len(emails) < total,
+			"has_more": has_more,
 		}
 		
 	except Exception as e:
@@ -169,24 +370,12 @@ def get_scheduled_email(email_id: str) -> dict:
 	_validate_user_permissions()
 	
 	email_id = _sanitize_input(cstr(email_id).strip())
-	user = frappe.session.user
-	
-	# Try to find by ID first, then by name
-	email = None
 	
-	for field in ["id", "name"]:
-		email = frappe.get_value(
-			"Mail Queue",
-			{"user": user, field: email_id},
-			[
-				"name", "id", "from_email", "from_name", "subject",
-				"html_body", "text_body", "scheduled_at", "creation",
-				"status", "error_message", "submission_id"
-			],
-			as_dict=True,
-		)
-		if email:
-			break
+	email = _find_user_mail_queue(email_id, [
+		"name", "id", "from_email", "from_name", "subject",
+		"html_body", "text_body", "scheduled_at", "creation",
+		"status", "error_message", "submission_id"
+	])
 	
 	if not email:
 		raise SchedulerValidationError(_("Email not found"))
@@ -198,10 +387,13 @@ def get_scheduled_email(email_id: str) -> dict:
 		fields=["email", "type", "display_name"],
 	)
 	
+	buckets = defaultdict(list)
+	for r in recipients:
+		buckets[r["type"]].append(r["email"])
 	email["recipients"] = recipients
-	email["to"] = [r["email"] for r in recipients if r["type"] == "To"]
-	email["cc"] = [r["email"] for r in recipients if r["type"] == "Cc"]
-	email["bcc"] = [r["email"] for r in recipients if r["type"] == "Bcc"]
+	email["to"] = buckets["To"]
+	email["cc"] = buckets["Cc"]
+	email["bcc"] = buckets["Bcc"]
 	
 	# Get attachments
 	attachments = frappe.get_all(
@@ -237,37 +429,17 @@ def cancel_scheduled_email(email_id: str) -> dict:
 	user = frappe.session.user
 	
 	# Find the email
-	mail_queue = None
-	for field in ["id", "name"]:
-		mail_queue = frappe.get_value(
-			"Mail Queue",
-			{"user": user, field: email_id},
-			["name", "id", "from_email", "scheduled_at", "status", "submission_id"],
-			as_dict=True,
-		)
-		if mail_queue:
-			break
+	mail_queue = _find_user_mail_queue(
+		email_id, ["name", "id", "from_email", "scheduled_at", "status", "submission_id"]
+	)
 	
 	if not mail_queue:
 		raise SchedulerValidationError(_("Scheduled email not found"))
 	
 	# Validate state
-	if not mail_queue.scheduled_at:
-		raise SchedulerValidationError(_("This email is not scheduled"))
-	
-	if mail_queue.status in ["Sent", "Delivered"]:
-		raise SchedulerValidationError(_("Cannot cancel an email that has already been sent"))
-	
-	if mail_queue.status == "Cancelled":
-		raise SchedulerValidationError(_("This email is already cancelled"))
-	
-	# Check if past schedule time (with 30 second grace period)
-	schedule_time = get_datetime(mail_queue.scheduled_at)
-	if schedule_time <= now_datetime():
-		# Check if very recently passed
-		delta = (now_datetime() - schedule_time).total_seconds()
-		if delta > 30:
-			raise SchedulerValidationError(_("Cannot cancel an email past its scheduled time"))
+	error = _get_cancel_error(mail_queue, now_datetime())
+	if error:
+		raise SchedulerValidationError(error)
 	
 	_log_scheduler_event("cancel_attempt", {
 		"email_id": email_id,
@@ -281,8 +453,7 @@ def cancel_scheduled_email(email_id: str) -> dict:
 	
 	if mail_queue.submission_id:
 		try:
-			from mail_scheduler.jmap.futurerelease import email_submission_cancel
-			email_submission_cancel(user, mail_queue.id)
+			email_submissions_cancel(user, [mail_queue.submission_id])
 			jmap_cancelled = True
 		except Exception as e:
 			jmap_error = str(e)
@@ -294,7 +465,7 @@ def cancel_scheduled_email(email_id: str) -> dict:
 			"status": "Cancelled",
 			"error_message": "Cancelled by user" + (f" (JMAP: {jmap_error})" if jmap_error else ""),
 		})
-		frappe.db.commit()
+		_invalidate_scheduled_mail_count(user)
 	except Exception as e:
 		_get_logger().error(f"Failed to update Mail Queue status: {e}")
 		raise
@@ -313,6 +484,139 @@ def cancel_scheduled_email(email_id: str) -> dict:
 	}
 
 
+@frappe.whitelist()
+@rate_limit(limit=10, seconds=60)
+def bulk_cancel_scheduled_emails(email_ids: list[str]) -> dict:
+	"""
+	Cancel several scheduled emails at once.
+	
+	All emails are looked up with one query, their submissions are
+	cancelled with one JMAP request and their status with one UPDATE.
+	Batches larger than BULK_CANCEL_SYNC_LIMIT are cancelled in a
+	background job; the response then carries the job id.
+	
+	Args:
+		email_ids: JMAP email IDs or Mail Queue names (max MAX_BATCH_SIZE)
+		
+	Returns:
+		dict with the cancelled, JMAP cancelled and skipped email IDs, or
+		the job id when queued
+	"""
+	_validate_user_permissions()
+	
+	if isinstance(email_ids, str):
+		email_ids = frappe.parse_json(email_ids)
+	
+	email_ids = list(dict.fromkeys(
+		_sanitize_input(cstr(email_id).strip()) for email_id in (email_ids or []) if email_id
+	))
+	if not email_ids:
+		raise SchedulerValidationError(_("No scheduled emails given"))
+	if len(email_ids) > MAX_BATCH_SIZE:
+		raise SchedulerValidationError(
+			_("Too many emails. Maximum allowed: {0}").format(MAX_BATCH_SIZE)
+		)
+	
+	user = frappe.session.user
+	
+	# Large batches can outlast the request timeout; cancel them in a job
+	if len(email_ids) > BULK_CANCEL_SYNC_LIMIT:
+		# The same batch submitted again while queued is not cancelled twice
+		batch_hash = hashlib.sha1("\n".join(sorted(email_ids)).encode()).hexdigest()[:16]
+		job_id = f"mail-scheduler-bulk-cancel-{user}-{batch_hash}"
+		frappe.enqueue(
+			"mail_scheduler.api.scheduled._bulk_cancel_worker",
+			queue="default",
+			timeout=600,
+			job_id=job_id,
+			deduplicate=True,
+			user=user,
+			email_ids=email_ids,
+		)
+		return {
+			"success": True,
+			"status": "queued",
+			"job_id": job_id,
+		}
+	
+	return _bulk_cancel_worker(user, email_ids)
+
+
+def _bulk_cancel_worker(user: str, email_ids: list[str]) -> dict:
+	"""
+	Cancel the given scheduled emails of a user.
+	
+	Runs inline for small batches and as a background job for large ones.
+	
+	Args:
+		user: User who owns the emails
+		email_ids: Sanitized JMAP email IDs or Mail Queue names
+		
+	Returns:
+		dict with the cancelled, JMAP cancelled and skipped email IDs
+	"""
+	# One lookup for all emails, by JMAP id or by name
+	rows = frappe.get_all(
+		"Mail Queue",
+		filters={"user": user},
+		or_filters={"id": ["in", email_ids], "name": ["in", email_ids]},
+		fields=["name", "id", "scheduled_at", "status", "submission_id"],
+	)
+	rows_by_key = {row.name: row for row in rows}
+	rows_by_key.update({row.id: row for row in rows if row.id})
+	
+	now = now_datetime()
+	skipped = {}
+	cancellable = {}
+	for email_id in email_ids:
+		row = rows_by_key.get(email_id)
+		error = _get_cancel_error(row, now) if row else _("Scheduled email not found")
+		if error:
+			skipped[email_id] = error
+		else:
+			cancellable.setdefault(row.name, (email_id, row))
+	
+	_log_scheduler_event("bulk_cancel_attempt", {
+		"mail_queues": list(cancellable),
+		"skipped": list(skipped),
+	})
+	
+	# All submissions belong to the same user, so one request cancels them
+	submissions = {
+		row.submission_id: email_id
+		for email_id, row in cancellable.values()
+		if row.submission_id
+	}
+	jmap_cancelled = []
+	jmap_error = None
+	if submissions:
+		try:
+			response = email_submissions_cancel(user, list(submissions))
+			updated = response.get("methodResponses", [[]])[0][1].get("updated") or {}
+			jmap_cancelled = [submissions[sid] for sid in updated if sid in submissions]
+		except Exception as e:
+			jmap_error = str(e)
+			_get_logger().warning(f"JMAP bulk cancel failed for {user}: {e}")
+	
+	_bulk_set_mail_queue_status(list(cancellable), "Cancelled", {
+		"error_message": "Cancelled by user" + (f" (JMAP: {jmap_error})" if jmap_error else ""),
+	})
+	_invalidate_scheduled_mail_count(user)
+	
+	_log_scheduler_event("bulk_cancel_success", {
+		"mail_queues": list(cancellable),
+		"jmap_cancelled": jmap_cancelled,
+	})
+	
+	return {
+		"success": True,
+		"cancelled": [email_id for email_id, row in cancellable.values()],
+		"jmap_cancelled": jmap_cancelled,
+		"jmap_error": jmap_error,
+		"skipped": skipped,
+	}
+
+
 @frappe.whitelist()
 @rate_limit(limit=30, seconds=60)
 def reschedule_email(email_id: str, new_scheduled_at: str) -> dict:
@@ -333,23 +637,14 @@ def reschedule_email(email_id: str, new_scheduled_at: str) -> dict:
 	
 	email_id = _sanitize_input(cstr(email_id).strip())
 	new_scheduled_at = _sanitize_input(cstr(new_scheduled_at).strip())
-	user = frappe.session.user
 	
 	# Validate new time
-	_validate_schedule_time(new_scheduled_at)
-	new_datetime = get_datetime(new_scheduled_at)
+	new_datetime = _validate_schedule_time(new_scheduled_at)
 	
 	# Find the email
-	mail_queue = None
-	for field in ["id", "name"]:
-		mail_queue = frappe.get_value(
-			"Mail Queue",
-			{"user": user, field: email_id},
-			["name", "id", "from_email", "scheduled_at", "status", "submission_id"],
-			as_dict=True,
-		)
-		if mail_queue:
-			break
+	mail_queue = _find_user_mail_queue(
+		email_id, ["name", "id", "from_email", "scheduled_at", "status", "submission_id"]
+	)
 	
 	if not mail_queue:
 		raise SchedulerValidationError(_("Scheduled email not found"))
@@ -381,7 +676,7 @@ def reschedule_email(email_id: str, new_scheduled_at: str) -> dict:
 		frappe.db.set_value("Mail Queue", mail_queue.name, {
 			"scheduled_at": new_datetime,
 		})
-		frappe.db.commit()
+		invalidate_next_due()
 	except Exception as e:
 		_get_logger().error(f"Failed to update scheduled_at: {e}")
 		raise
@@ -413,36 +708,28 @@ def get_scheduled_count() -> dict:
 	_validate_user_permissions()
 	
 	user = frappe.session.user
-	
-	# Get counts by status
-	base_filters = {
-		"user": user,
-		"scheduled_at": ["is", "set"],
-	}
-	
-	total = frappe.db.count("Mail Queue", base_filters)
-	
-	pending = frappe.db.count("Mail Queue", {
-		**base_filters,
-		"status": "Submitted",
-		"scheduled_at": [">", now_datetime()],
-	})
-	
-	sent = frappe.db.count("Mail Queue", {
-		**base_filters,
-		"status": ["in", ["Sent", "Delivered"]],
-	})
-	
-	cancelled = frappe.db.count("Mail Queue", {
-		**base_filters,
-		"status": "Cancelled",
-	})
-	
-	failed = frappe.db.count("Mail Queue", {
-		**base_filters,
-		"status": "Failed",
-	})
-	
+
+	# All counts from one grouped scan; pending is the future part of Submitted
+	MailQueue = frappe.qb.DocType("Mail Queue")
+	rows = (
+		frappe.qb.from_(MailQueue)
+		.select(
+			MailQueue.status,
+			Count("*").as_("cnt"),
+			Sum(Case().when(MailQueue.scheduled_at > now_datetime(), 1).else_(0)).as_("future_cnt"),
+		)
+		.where(MailQueue.user == user)
+		.where(MailQueue.scheduled_at.isnotnull())
+		.groupby(MailQueue.status)
+	).run(as_dict=True)
+
+	counts = {row.status: cint(row.cnt) for row in rows}
+	total = sum(counts.values())
+	pending = sum(cint(row.future_cnt) for row in rows if row.status == "Submitted")
+	sent = counts.get("Sent", 0) + counts.get("Delivered", 0)
+	cancelled = counts.get("Cancelled", 0)
+	failed = counts.get("Failed", 0)
+
 	return {
 		"total": total,
 		"pending": pending,
@@ -456,15 +743,15 @@ def get_scheduled_count() -> dict:
 def get_scheduler_config() -> dict:
 	"""
 	Get scheduler configuration for the frontend.
+
+	The configuration only changes with the site config, so the response
+	may be cached by the browser for SCHEDULER_CONFIG_MAX_AGE seconds.
 	
 	Returns:
 		dict with scheduler settings
 	"""
-	return {
-		"enabled": True,
-		"max_schedule_days": MAX_SCHEDULE_DAYS,
-		"min_schedule_minutes": 1,
-		"max_recipients": 500,
-		"max_attachments": 25,
-		"max_attachment_size_mb": 25,
-	}
+	response_headers = getattr(frappe.local, "response_headers", None)
+	if response_headers is not None:
+		response_headers["Cache-Control"] = f"private, max-age={SCHEDULER_CONFIG_MAX_AGE}"
+
+	return {**SCHEDULER_CONFIG, "max_schedule_days": get_max_schedule_days()}
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Schedule emails concurrently and report throughput and latency
+
+Not a test; it only runs when called explicitly, e.g.
+
+    bench --site <site> execute mail_scheduler.bench_scheduled_email.run --kwargs "{'n': 100}"
+
+The emails go to the sender's own address unless a recipient is given, so
+a run does not send anything to outside mailboxes.
+"""
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import frappe
+
+BENCH_USER = "admin@frappe.mn"
+BENCH_SENDER = "admin@frappe.mn"
+
+
+def run(n=1000, max_workers=16, recipient=None):
+    """Schedule `n` emails from `max_workers` threads and print the timings"""
+    from mail_scheduler.api.mail import _create_mail
+
+    site = frappe.local.site
+    recipient = recipient or BENCH_SENDER
+
+    # Schedule for 5 minutes from now
+    schedule_time = datetime.now() + timedelta(minutes=5)
+
+    print(f"=== Scheduled Email Throughput Benchmark ===")
+    print(f"User: {BENCH_USER}")
+    print(f"Recipient: {recipient}")
+    print(f"Emails: {n}, workers: {max_workers}")
+    print(f"Scheduled for: {schedule_time}")
+
+    payloads = [
+        {
+            "from_email": BENCH_SENDER,
+            "to": [recipient],
+            "subject": f"[BENCH] Scheduled Throughput Email {i + 1}/{n} - {schedule_time.strftime('%Y-%m-%d %H:%M:%S')}",
+            "html_body": f"<p>Scheduled throughput email {i + 1} of {n} from mail_scheduler addon.</p>",
+            "from_name": "Mail Scheduler Benchmark",
+            "scheduled_at": schedule_time.isoformat(),
+        }
+        for i in range(n)
+    ]
+
+    def send(payload):
+        # Each worker thread needs its own site context and connection
+        frappe.init(site=site)
+        frappe.connect()
+        try:
+            frappe.set_user(BENCH_USER)
+            start = time.perf_counter_ns()
+            try:
+                result = _create_mail(**payload, trusted=True)
+                frappe.db.commit()
+            except Exception as e:
+                frappe.db.rollback()
+                result = {"id": None, "error": str(e)}
+            return result, time.perf_counter_ns() - start
+        finally:
+            frappe.destroy()
+
+    try:
+        start = time.perf_counter_ns()
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            outcomes = list(ex.map(send, payloads))
+        wall = (time.perf_counter_ns() - start) / 1e9
+
+        results = [r for r, _ in outcomes]
+        latencies = sorted(ns / 1e6 for _, ns in outcomes)
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+        print(f"\n=== Result ===")
+        print(f"With ID: {sum(1 for r in results if r.get('id'))}/{n}")
+        print(f"Wall time: {wall:.2f}s")
+        print(f"Throughput: {n / wall:.1f} mails/s")
+        print(f"Latency p50: {p50:.1f}ms, p95: {p95:.1f}ms")
+        for r in results:
+            if r.get('error'):
+                print(f"Error: {r.get('error')}")
+
+        return {"results": results, "wall_time": wall, "p50_ms": p50, "p95_ms": p95}
+    except Exception as e:
+        traceback.print_exc()
+        return {"success": False, "error": str(e)}
@@ -6,11 +6,12 @@ Provides configuration to the frontend.
 
 import frappe
 
+from mail_scheduler.jmap.futurerelease import get_max_schedule_days
+
 
 def boot_session(bootinfo):
 	"""Add mail scheduler config to boot info."""
-	from mail_scheduler.jmap.futurerelease import get_max_schedule_days
-
+	# Per site config, so read on each boot (a dict lookup)
 	bootinfo.mail_scheduler = {
 		"enabled": True,
 		"max_schedule_days": get_max_schedule_days(),
@@ -26,7 +26,7 @@ doc_events = {
 "Mail Queue": {
 "before_insert": "mail_scheduler.overrides.mail_queue.before_insert",
 "validate": "mail_scheduler.overrides.mail_queue.validate",
-}
+},
 }
 
 # Override Whitelisted Methods
@@ -53,6 +53,9 @@ scheduler_events = {
 }
 }
 
+# Installation
+after_install = "mail_scheduler.setup.after_install"
+
 # Boot Session - provide config to frontend
 boot_session = "mail_scheduler.boot.boot_session"
 
@@ -61,5 +64,10 @@ boot_session = "mail_scheduler.boot.boot_session"
 # Frappe's build system will automatically resolve the hashed filename
 app_include_js = "/assets/mail_scheduler/dist/js/mail_scheduler.bundle.js"
 
-# Monkey patches applied on app startup
-after_app_load = "mail_scheduler.monkey_patches.apply_patches"
+# Drop process-level caches on bench clear-cache
+clear_cache = [
+"mail_scheduler.www.mail.invalidate_boot_cache",
+]
+
+# Monkey patches applied when the mail modules they patch are imported
+after_app_load = "mail_scheduler.monkey_patches.install_lazy_patches"
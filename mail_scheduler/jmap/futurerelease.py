@@ -14,9 +14,167 @@ The HOLDUNTIL parameter is added to envelope.mailFrom.parameters in the
 EmailSubmission/set JMAP call.
 """
 
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+
 import frappe
+import requests
 from frappe import _
-from frappe.utils import get_datetime
+from frappe.utils import cint, get_datetime
+
+
+# Process-wide JMAP clients, keyed by (site, user). Reusing the client keeps
+# its authenticated session and pooled HTTP connections to Stalwart alive
+# across requests and scheduler runs instead of reconnecting every time.
+# Threads share the clients, so each one is used by one request at a time.
+JMAP_CLIENT_TTL = 300  # seconds
+JMAP_MAX_OBJECTS_IN_GET = 500  # maxObjectsInGet servers are expected to allow (RFC 8620)
+DEFAULT_MAX_DELAYED_SEND = 2592000  # seconds, Stalwart's default future-release limit
+JMAP_MAX_PARALLEL_USERS = 16  # concurrent requests when acting for several users
+_client_cache: dict[tuple[str, str], tuple[object, float]] = {}
+_client_cache_lock = threading.Lock()
+_client_locks: "weakref.WeakKeyDictionary[object, threading.Lock]" = weakref.WeakKeyDictionary()
+
+# Envelope parameters shared by every scheduled submission
+_BASE_MAILFROM = {"RET": "FULL"}
+_BASE_RCPT_PARAMS = {"NOTIFY": "DELAY,FAILURE"}
+_PRIO_STR = {i: str(i) for i in range(-4, 5)}  # MT-PRIORITY values (RFC 6710)
+
+
+def _get_cached_jmap_client(user: str):
+	"""
+	Get the JMAP client for a user, reused across requests.
+
+	Clients are kept on frappe.local for the rest of the request and in a
+	process-wide cache for JMAP_CLIENT_TTL seconds.
+
+	Args:
+		user: User to get the client for
+
+	Returns:
+		JMAPClient instance
+	"""
+	from mail.jmap import get_jmap_client
+
+	clients = getattr(frappe.local, "mail_scheduler_jmap_clients", None)
+	if clients is None:
+		clients = frappe.local.mail_scheduler_jmap_clients = {}
+
+	client = clients.get(user)
+	if client is not None:
+		return client
+
+	key = (frappe.local.site, user)
+	now = time.monotonic()
+	with _client_cache_lock:
+		cached = _client_cache.get(key)
+		if cached and cached[1] > now:
+			client = cached[0]
+
+	if client is None:
+		client = get_jmap_client(user)
+		with _client_cache_lock:
+			_client_cache[key] = (client, now + JMAP_CLIENT_TTL)
+
+	clients[user] = client
+	return client
+
+
+def evict_jmap_client(user: str) -> None:
+	"""Drop the cached JMAP client of a user, e.g. after a failed request."""
+	clients = getattr(frappe.local, "mail_scheduler_jmap_clients", None)
+	if clients:
+		clients.pop(user, None)
+
+	with _client_cache_lock:
+		_client_cache.pop((frappe.local.site, user), None)
+
+
+def _get_client_lock(client) -> threading.Lock:
+	"""Get the lock that serializes the requests made with a JMAP client."""
+	with _client_cache_lock:
+		lock = _client_locks.get(client)
+		if lock is None:
+			lock = _client_locks[client] = threading.Lock()
+	return lock
+
+
+def _request(client, using: list[str], build_method_calls) -> dict:
+	"""Make a JMAP request, holding the client's lock for its duration."""
+	method_calls = build_method_calls(client)
+	with _get_client_lock(client):
+		return client._make_request(using=using, method_calls=method_calls)
+
+
+def _is_stale_client_error(e: Exception) -> bool:
+	"""
+	Check whether a request failed because of the client rather than the request.
+
+	Dropped connections and expired credentials (401) are fixed by a fresh
+	client. Anything else, e.g. a JMAP method error, would fail the same way
+	again.
+	"""
+	if isinstance(e, requests.ConnectionError):
+		return True
+	return getattr(getattr(e, "response", None), "status_code", None) == 401
+
+
+def _make_jmap_request(user: str | None, build_method_calls, client=None) -> dict:
+	"""
+	Run a JMAP request with the cached client of a user.
+
+	A request that failed on a dropped connection or an expired session is
+	retried once with a fresh client.
+
+	Args:
+		user: User to make the request for
+		build_method_calls: Callable taking the client and returning the
+			method calls
+		client: JMAPClient to use instead of the cached one of `user`; the
+			request is then not retried
+
+	Returns:
+		dict: JMAP response
+	"""
+	using = ["urn:ietf:params:jmap:mail", "urn:ietf:params:jmap:submission"]
+
+	if client is not None:
+		return _request(client, using, build_method_calls)
+
+	client = _get_cached_jmap_client(user)
+	try:
+		return _request(client, using, build_method_calls)
+	except Exception as e:
+		if not _is_stale_client_error(e):
+			raise
+		evict_jmap_client(user)
+
+	return _request(_get_cached_jmap_client(user), using, build_method_calls)
+
+
+@lru_cache(maxsize=1024)
+def _epoch_from_str(value: str) -> int:
+	"""
+	Convert a datetime string to a Unix timestamp, memoized.
+
+	Plain "YYYY-MM-DD HH:MM:SS" values are parsed by slicing; anything else
+	goes through get_datetime.
+	"""
+	if len(value) == 19 and value[4] == value[7] == "-" and value[10] == " " and value[13] == value[16] == ":":
+		try:
+			return int(datetime(
+				int(value[0:4]), int(value[5:7]), int(value[8:10]),
+				int(value[11:13]), int(value[14:16]), int(value[17:19]),
+			).timestamp())
+		except ValueError:
+			pass
+
+	return int(get_datetime(value).timestamp())
 
 
 def get_holduntil_timestamp(scheduled_at) -> int:
@@ -29,16 +187,41 @@ def get_holduntil_timestamp(scheduled_at) -> int:
 	Returns:
 		Unix timestamp as integer
 	"""
-	dt = get_datetime(scheduled_at)
-	return int(dt.timestamp())
+	if isinstance(scheduled_at, datetime):
+		return int(scheduled_at.timestamp())
+	if isinstance(scheduled_at, str):
+		return _epoch_from_str(scheduled_at)
+
+	return int(get_datetime(scheduled_at).timestamp())
+
+
+def _dedup_rcpt(emails: tuple[str, ...]) -> list[dict]:
+	"""
+	Build the rcptTo entries for a recipient list, deduplicated and sorted.
+
+	The entries are built fresh for every envelope, so a request payload
+	never shares them with another.
+
+	Args:
+		emails: Recipient addresses
+
+	Returns:
+		list of rcptTo entries
+	"""
+	orcpt = "rfc822;{}".format
+	return [
+		{"email": email, "parameters": {**_BASE_RCPT_PARAMS, "ORCPT": orcpt(email)}}
+		for email in sorted(set(emails))
+	]
 
 
 def build_scheduled_envelope(
 	from_email: str,
-	recipients: list[dict],
+	recipients: list[dict] | tuple[str, ...],
 	creation_id: str,
 	priority: int = 0,
 	scheduled_at=None,
+	holduntil: int | None = None,
 ) -> dict:
 	"""
 	Build an envelope dict with FUTURERELEASE parameters for scheduled delivery.
@@ -48,24 +231,34 @@ def build_scheduled_envelope(
 
 	Args:
 		from_email: Sender email address
-		recipients: List of recipient dicts with 'email' key
+		recipients: List of recipient dicts with 'email' key (or addresses),
+			or a tuple of addresses; duplicates are sent once
 		creation_id: Unique ID for this submission
 		priority: MT-PRIORITY value (-4 to 4)
 		scheduled_at: datetime for scheduled delivery (None for immediate)
+		holduntil: Precomputed HOLDUNTIL timestamp, used instead of
+			scheduled_at when several envelopes share the same release time
 
 	Returns:
 		dict: Envelope structure for JMAP EmailSubmission
 	"""
+	# Normalize recipients to addresses once; a tuple of addresses is used as is
+	if isinstance(recipients, tuple):
+		emails = recipients
+	else:
+		emails = tuple(rcpt["email"] if isinstance(rcpt, dict) else rcpt for rcpt in recipients)
+
 	# Build mailFrom parameters
 	mail_from_params = {
-		"RET": "FULL",
+		**_BASE_MAILFROM,
 		"ENVID": creation_id,
-		"MT-PRIORITY": str(priority),
+		"MT-PRIORITY": _PRIO_STR.get(priority) or str(priority),
 	}
 
 	# Add HOLDUNTIL for scheduled delivery
-	if scheduled_at:
+	if holduntil is None and scheduled_at:
 		holduntil = get_holduntil_timestamp(scheduled_at)
+	if holduntil is not None:
 		mail_from_params["HOLDUNTIL"] = str(holduntil)
 
 	envelope = {
@@ -73,90 +266,197 @@ def build_scheduled_envelope(
 			"email": from_email,
 			"parameters": mail_from_params,
 		},
-		"rcptTo": [
-			{
-				"email": rcpt["email"] if isinstance(rcpt, dict) else rcpt,
-				"parameters": {
-					"NOTIFY": "DELAY,FAILURE",
-					"ORCPT": f"rfc822;{rcpt['email'] if isinstance(rcpt, dict) else rcpt}",
-				},
-			}
-			for rcpt in recipients
-		],
+		"rcptTo": _dedup_rcpt(emails),
 	}
 
 	return envelope
 
 
-def email_submission_cancel(user: str, submission_id: str) -> dict:
+def _cancel_calls(client, submission_ids: list[str]) -> list:
+	"""Method calls cancelling submissions in one EmailSubmission/set."""
+	return [
+		[
+			"EmailSubmission/set",
+			{
+				"accountId": client.primary_account_id,
+				"update": {
+					submission_id: {
+						"undoStatus": "canceled",
+					}
+					for submission_id in submission_ids
+				},
+			},
+			"0",
+		]
+	]
+
+
+def _get_calls(client, submission_ids: list[str]) -> list:
+	"""Method calls getting submissions, JMAP_MAX_OBJECTS_IN_GET IDs per call."""
+	return [
+		[
+			"EmailSubmission/get",
+			{
+				"accountId": client.primary_account_id,
+				"ids": submission_ids[i : i + JMAP_MAX_OBJECTS_IN_GET],
+			},
+			str(n),
+		]
+		for n, i in enumerate(range(0, len(submission_ids), JMAP_MAX_OBJECTS_IN_GET))
+	]
+
+
+def _submissions_by_id(response: dict) -> dict[str, dict]:
+	"""Collect the submissions of EmailSubmission/get responses by ID."""
+	return {
+		submission["id"]: submission
+		for method_response in response.get("methodResponses", [])
+		for submission in method_response[1].get("list", [])
+	}
+
+
+def _make_jmap_requests(build_method_calls: dict[str, Callable]) -> dict[str, dict | Exception]:
 	"""
-	Cancel a scheduled email submission.
+	Run one JMAP request per user, concurrently.
 
-	Uses EmailSubmission/set with update to set undoStatus to "canceled".
+	Every user has their own JMAP session, so requests of different users
+	cannot be batched; they are blocking HTTP calls and are run on a pool of
+	at most JMAP_MAX_PARALLEL_USERS threads instead. Clients are resolved
+	here, in the calling thread, because the worker threads have no site
+	context. Requests that failed on the client are retried once with a
+	fresh one, like _make_jmap_request.
 
 	Args:
-		user: User who owns the submission
-		submission_id: JMAP submission ID
+		build_method_calls: Callable taking the client and returning the
+			method calls, by user
 
 	Returns:
-		dict: JMAP response
+		dict: JMAP response, or the exception it failed with, by user
 	"""
-	from mail.jmap import get_jmap_client
+	if len(build_method_calls) <= 1:
+		results = {}
+		for user, build in build_method_calls.items():
+			try:
+				results[user] = _make_jmap_request(user, build)
+			except Exception as e:
+				results[user] = e
+		return results
+
+	clients = {user: _get_cached_jmap_client(user) for user in build_method_calls}
+
+	def run(user: str) -> dict:
+		return _make_jmap_request(user, build_method_calls[user], clients[user])
+
+	results = {}
+	stale = []
+	with ThreadPoolExecutor(max_workers=min(JMAP_MAX_PARALLEL_USERS, len(clients))) as pool:
+		futures = {pool.submit(run, user): user for user in clients}
+		for future in as_completed(futures):
+			user = futures[future]
+			try:
+				results[user] = future.result()
+			except Exception as e:
+				if _is_stale_client_error(e):
+					evict_jmap_client(user)
+					stale.append(user)
+				else:
+					results[user] = e
+
+	for user in stale:
+		try:
+			results[user] = _make_jmap_request(
+				user, build_method_calls[user], _get_cached_jmap_client(user)
+			)
+		except Exception as e:
+			results[user] = e
+
+	return results
+
+
+def email_submissions_cancel(user: str | None, submission_ids: list[str], client=None) -> dict:
+	"""
+	Cancel scheduled email submissions in a single JMAP request.
 
-	client = get_jmap_client(user)
-
-	response = client._make_request(
-		using=["urn:ietf:params:jmap:mail", "urn:ietf:params:jmap:submission"],
-		method_calls=[
-			[
-				"EmailSubmission/set",
-				{
-					"accountId": client.primary_account_id,
-					"update": {
-						submission_id: {
-							"undoStatus": "canceled",
-						}
-					},
-				},
-				"0",
-			]
-		],
-	)
+	EmailSubmission/set accepts a map of updates, so all submissions of a
+	user are cancelled in one round trip.
+
+	Args:
+		user: User who owns the submissions
+		submission_ids: JMAP submission IDs
+		client: JMAPClient of the user, if the caller already holds one
 
-	return response
+	Returns:
+		dict: JMAP response; cancelled IDs are listed in the "updated" map
+	"""
+	return _make_jmap_request(user, lambda c: _cancel_calls(c, submission_ids), client)
 
 
-def email_submission_get(user: str, submission_id: str) -> dict | None:
+def email_submissions_cancel_many(submission_ids_by_user: dict[str, list[str]]) -> dict[str, dict | Exception]:
 	"""
-	Get details of an email submission.
+	Cancel scheduled email submissions of several users.
+
+	One request per user, run concurrently (see _make_jmap_requests).
 
 	Args:
-		user: User who owns the submission
-		submission_id: JMAP submission ID
+		submission_ids_by_user: JMAP submission IDs by the user who owns them
 
 	Returns:
-		dict: Submission details or None if not found
+		dict: JMAP response, or the exception it failed with, by user
 	"""
-	from mail.jmap import get_jmap_client
+	return _make_jmap_requests({
+		user: (lambda client, ids=ids: _cancel_calls(client, ids))
+		for user, ids in submission_ids_by_user.items()
+		if ids
+	})
 
-	client = get_jmap_client(user)
 
-	response = client._make_request(
-		using=["urn:ietf:params:jmap:mail", "urn:ietf:params:jmap:submission"],
-		method_calls=[
-			[
-				"EmailSubmission/get",
-				{
-					"accountId": client.primary_account_id,
-					"ids": [submission_id],
-				},
-				"0",
-			]
-		],
+def email_submissions_get(user: str | None, submission_ids: list[str], client=None) -> dict[str, dict]:
+	"""
+	Get email submissions of a user in a single JMAP request.
+
+	IDs are split over several EmailSubmission/get calls of at most
+	JMAP_MAX_OBJECTS_IN_GET IDs each, all sent in the same request.
+
+	Args:
+		user: User who owns the submissions
+		submission_ids: JMAP submission IDs
+		client: JMAPClient of the user, if the caller already holds one
+
+	Returns:
+		dict: Submission details by ID; IDs not found are left out
+	"""
+	if not submission_ids:
+		return {}
+
+	return _submissions_by_id(
+		_make_jmap_request(user, lambda c: _get_calls(c, submission_ids), client)
 	)
 
-	submissions = response.get("methodResponses", [[]])[0][1].get("list", [])
-	return submissions[0] if submissions else None
+
+def email_submissions_get_many(
+	submission_ids_by_user: dict[str, list[str]],
+) -> dict[str, dict[str, dict] | Exception]:
+	"""
+	Get email submissions of several users.
+
+	One request per user, run concurrently (see _make_jmap_requests).
+
+	Args:
+		submission_ids_by_user: JMAP submission IDs by the user who owns them
+
+	Returns:
+		dict: Submission details by ID (IDs not found are left out), or the
+			exception the request failed with, by user
+	"""
+	responses = _make_jmap_requests({
+		user: (lambda client, ids=ids: _get_calls(client, ids))
+		for user, ids in submission_ids_by_user.items()
+		if ids
+	})
+	return {
+		user: response if isinstance(response, Exception) else _submissions_by_id(response)
+		for user, response in responses.items()
+	}
 
 
 def get_submission_capabilities(user: str) -> dict:
@@ -171,9 +471,7 @@ def get_submission_capabilities(user: str) -> dict:
 	Returns:
 		dict: Submission capabilities
 	"""
-	from mail.jmap import get_jmap_client
-
-	client = get_jmap_client(user)
+	client = _get_cached_jmap_client(user)
 
 	# Get account-level capabilities
 	account_id = client.primary_account_id
@@ -196,9 +494,9 @@ def get_max_delayed_send(user: str) -> int:
 	"""
 	try:
 		caps = get_submission_capabilities(user)
-		return caps.get("maxDelayedSend", 2592000)
+		return caps.get("maxDelayedSend", DEFAULT_MAX_DELAYED_SEND)
 	except Exception:
-		return 2592000  # Default to 30 days
+		return DEFAULT_MAX_DELAYED_SEND  # Default to 30 days
 
 
 def get_max_schedule_days() -> int:
@@ -208,17 +506,20 @@ def get_max_schedule_days() -> int:
 	Returns:
 		int: Maximum days (30 based on Stalwart default)
 	"""
-	return 30
+	return get_max_schedule_seconds() // 86400
 
 
 def get_max_schedule_seconds() -> int:
 	"""
 	Get the maximum number of seconds an email can be scheduled in advance.
 
+	Read from the `stalwart_max_delayed_send` site config key, a plain dict
+	lookup, so it is cheap enough for every page load.
+
 	Returns:
 		int: Maximum seconds (2592000 = 30 days based on Stalwart default)
 	"""
-	return 2592000
+	return cint(frappe.conf.get("stalwart_max_delayed_send")) or DEFAULT_MAX_DELAYED_SEND
 
 
 def is_futurerelease_supported(user: str) -> bool:
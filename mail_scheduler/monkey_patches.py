@@ -16,15 +16,45 @@ Features:
 import frappe
 from frappe import _
 from frappe.utils import get_datetime, now_datetime
+import importlib
+import inspect
+import sys
 import threading
-from functools import wraps
-from typing import Any, Callable
+import time
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from typing import Any, Callable, Iterable
+
+from mail_scheduler.utils import get_scheduled_at, invalidate_next_due, scheduled_send
+
+# Modules whose classes are patched
+_PATCHED_MODULES = ("mail.jmap", "mail.client.doctype.mail_queue.mail_queue")
 
 # Thread-safe patch state
 _patch_lock = threading.Lock()
 _original_email_create = None
+_original_mail_queue_create = None
 _patch_applied = False
 
+# Identity and mailbox IDs are stable per account, so they are looked up
+# once per JMAP_ID_CACHE_TTL instead of on every scheduled send
+JMAP_ID_CACHE_TTL = 900  # seconds
+_id_cache: dict[tuple, tuple[str, float]] = {}
+_id_cache_lock = threading.Lock()
+
+# Body structures of scheduled drafts by (has text body, has HTML body).
+# Shared between payloads, never modified.
+_TEXT_PART = {"type": "text/plain", "partId": "text"}
+_HTML_PART = {"type": "text/html", "partId": "html"}
+_BODY_TEMPLATES = {
+	(True, False): _TEXT_PART,
+	(False, True): _HTML_PART,
+	(True, True): {"type": "multipart/alternative", "subParts": [_TEXT_PART, _HTML_PART]},
+}
+
+# Whether Mail Queue has the submission_id custom field, per site
+_submission_id_column: dict[str, bool] = {}
+
 
 def _get_logger():
 	"""Get or create the mail scheduler logger."""
@@ -60,6 +90,14 @@ def apply_patches() -> bool:
 		True if patches were applied successfully, False otherwise
 	"""
 	global _patch_applied
+
+	# Import the patched modules before taking the lock: a pending lazy
+	# finder patches them on import and takes the lock itself
+	for module in _PATCHED_MODULES:
+		try:
+			importlib.import_module(module)
+		except ImportError:
+			pass  # Reported by the patch below
 	
 	with _patch_lock:
 		if _patch_applied:
@@ -68,7 +106,7 @@ def apply_patches() -> bool:
 		
 		try:
 			_log_info("Applying mail scheduler monkey patches...")
-			success = _patch_jmap_client_email_create()
+			success = _patch_jmap_client_email_create() and _patch_mail_queue_create()
 			
 			if success:
 				_patch_applied = True
@@ -83,6 +121,88 @@ def apply_patches() -> bool:
 			return False
 
 
+class _LazyPatchFinder:
+	"""
+	Import hook that applies a patch right after its target module is imported.
+
+	It only wraps the loader of the watched modules and removes itself from
+	sys.meta_path once every patch is in place.
+	"""
+
+	def __init__(self, patches: dict[str, Callable[[], bool]]):
+		self.patches = dict(patches)
+
+	def find_spec(self, fullname, path=None, target=None):
+		if fullname not in self.patches:
+			return None
+
+		for finder in sys.meta_path:
+			if finder is self or not hasattr(finder, "find_spec"):
+				continue
+			spec = finder.find_spec(fullname, path, target)
+			if spec is not None:
+				break
+		else:
+			return None
+
+		loader = spec.loader
+		exec_module = getattr(loader, "exec_module", None)
+		if exec_module is None:
+			return spec
+
+		def patched_exec_module(module):
+			exec_module(module)
+			self._apply(fullname)
+
+		loader.exec_module = patched_exec_module
+		return spec
+
+	def _apply(self, fullname: str) -> None:
+		global _patch_applied
+
+		with _patch_lock:
+			patch = self.patches.pop(fullname, None)
+			if patch is None:
+				return
+
+			try:
+				if not patch():
+					_log_error(f"Failed to apply lazy patch for {fullname}")
+			except Exception as e:
+				_log_error(f"Error applying lazy patch for {fullname}: {e}", exc=e)
+
+			if not self.patches:
+				_patch_applied = _original_email_create is not None and _original_mail_queue_create is not None
+				if self in sys.meta_path:
+					sys.meta_path.remove(self)
+
+
+def install_lazy_patches() -> None:
+	"""
+	Apply the monkey patches when the patched mail modules are first imported.
+
+	Workers that never send mail skip importing JMAPClient and MailQueue at
+	startup. Modules that are already imported are patched right away.
+	"""
+	patches = dict(zip(_PATCHED_MODULES, (_patch_jmap_client_email_create, _patch_mail_queue_create)))
+
+	with _patch_lock:
+		if _patch_applied or any(isinstance(f, _LazyPatchFinder) for f in sys.meta_path):
+			return
+
+	pending = {name: patch for name, patch in patches.items() if name not in sys.modules}
+	if not pending:
+		apply_patches()
+		return
+
+	finder = _LazyPatchFinder(pending)
+	sys.meta_path.insert(0, finder)
+	for name in patches.keys() - pending.keys():
+		# Already imported, patch now
+		finder.patches[name] = patches[name]
+		finder._apply(name)
+
+
 def _patch_jmap_client_email_create() -> bool:
 	"""
 	Patch JMAPClient.email_create to add HOLDUNTIL parameter for scheduled emails.
@@ -105,88 +225,66 @@ def _patch_jmap_client_email_create() -> bool:
 	# Store original method
 	_original_email_create = JMAPClient.email_create
 
-	def patched_email_create(
-		self,
-		creation_id,
-		from_email,
-		recipients,
-		from_name=None,
-		subject=None,
-		sent_at=None,
-		message_id=None,
-		reply_to=None,
-		in_reply_to=None,
-		headers=None,
-		text_body=None,
-		html_body=None,
-		attachments=None,
-		raw_message=None,
-		existing_id=None,
-		save_as_draft=False,
-		priority=0,
-		destroy_after_submit=False,
-		forwarded_id=None,
-		reply_to_id=None,
-	):
+	# Bound once: the schedule branch needs the arguments by name, the
+	# pass-through branch forwards them untouched
+	signature = inspect.signature(_original_email_create)
+	params = list(signature.parameters)
+	save_as_draft_index = params.index("save_as_draft") - 1 if "save_as_draft" in params else None
+	schedule_params = [
+		name for name in inspect.signature(_email_create_with_schedule).parameters
+		if name not in ("client", "scheduled_at")
+	]
+
+	def patched_email_create(self, *args, **kwargs):
 		"""
 		Patched email_create that adds HOLDUNTIL for scheduled emails.
 		"""
 		scheduled_at = None
 		
 		try:
-			scheduled_at = frappe.flags.get("mail_scheduler_scheduled_at")
+			scheduled_at = get_scheduled_at()
 		except Exception:
-			pass  # No frappe context, proceed normally
+			pass  # No scheduling context, proceed normally
 		
-		# If not scheduled or saving as draft, use original method
-		if not scheduled_at or save_as_draft:
+		if not scheduled_at:
+			return _original_email_create(self, *args, **kwargs)
+
+		# If saving as draft, use original method
+		if save_as_draft_index is not None and len(args) > save_as_draft_index:
+			save_as_draft = args[save_as_draft_index]
+		else:
+			save_as_draft = kwargs.get("save_as_draft", False)
+
+		if save_as_draft:
 			_log_debug(f"Using original email_create (scheduled_at={scheduled_at}, save_as_draft={save_as_draft})")
-			return _original_email_create(
-				self, creation_id, from_email, recipients, from_name, subject,
-				sent_at, message_id, reply_to, in_reply_to, headers, text_body,
-				html_body, attachments, raw_message, existing_id, save_as_draft,
-				priority, destroy_after_submit, forwarded_id, reply_to_id,
-			)
+			return _original_email_create(self, *args, **kwargs)
 
 		# Validate scheduled time
 		try:
 			schedule_dt = get_datetime(scheduled_at)
 			if schedule_dt <= now_datetime():
 				_log_error(f"Scheduled time {scheduled_at} is in the past, sending immediately")
-				return _original_email_create(
-					self, creation_id, from_email, recipients, from_name, subject,
-					sent_at, message_id, reply_to, in_reply_to, headers, text_body,
-					html_body, attachments, raw_message, existing_id, save_as_draft,
-					priority, destroy_after_submit, forwarded_id, reply_to_id,
-				)
+				return _original_email_create(self, *args, **kwargs)
 		except Exception as e:
 			_log_error(f"Invalid scheduled_at value: {e}", exc=e)
-			return _original_email_create(
-				self, creation_id, from_email, recipients, from_name, subject,
-				sent_at, message_id, reply_to, in_reply_to, headers, text_body,
-				html_body, attachments, raw_message, existing_id, save_as_draft,
-				priority, destroy_after_submit, forwarded_id, reply_to_id,
-			)
+			return _original_email_create(self, *args, **kwargs)
 
 		# Use scheduled email creation
 		_log_info(f"Creating scheduled email with HOLDUNTIL={scheduled_at}")
 		
 		try:
+			bound = signature.bind(self, *args, **kwargs)
+			bound.apply_defaults()
+			arguments = bound.arguments
 			return _email_create_with_schedule(
-				self, creation_id, from_email, recipients, from_name, subject,
-				sent_at, message_id, reply_to, in_reply_to, headers, text_body,
-				html_body, attachments, raw_message, existing_id, priority,
-				destroy_after_submit, forwarded_id, reply_to_id, scheduled_at,
+				self,
+				**{name: arguments.get(name) for name in schedule_params},
+				scheduled_at=scheduled_at,
 			)
 		except Exception as e:
 			_log_error(f"Scheduled email creation failed, falling back to immediate send: {e}", exc=e)
 			# Fallback to immediate send on error
-			return _original_email_create(
-				self, creation_id, from_email, recipients, from_name, subject,
-				sent_at, message_id, reply_to, in_reply_to, headers, text_body,
-				html_body, attachments, raw_message, existing_id, save_as_draft,
-				priority, destroy_after_submit, forwarded_id, reply_to_id,
-			)
+			return _original_email_create(self, *args, **kwargs)
 
 	# Apply patch
 	JMAPClient.email_create = patched_email_create
@@ -194,6 +292,280 @@ def _patch_jmap_client_email_create() -> bool:
 	return True
 
 
+def _patch_mail_queue_create() -> bool:
+	"""
+	Patch MailQueue._create to take the schedule time as a keyword argument.
+
+	The time is made available to the before_insert hook and the patched
+	email_create through mail_scheduler.utils.scheduled_send for the
+	duration of the call.
+
+	Returns:
+		True if patch was applied successfully
+	"""
+	global _original_mail_queue_create
+
+	try:
+		from mail.client.doctype.mail_queue.mail_queue import MailQueue
+	except ImportError as e:
+		_log_error(f"Could not import MailQueue: {e}")
+		return False
+
+	if _original_mail_queue_create is not None:
+		_log_debug("MailQueue._create already patched")
+		return True
+
+	# Keep the raw descriptor so static/class methods stay what they were
+	_original_mail_queue_create = MailQueue.__dict__["_create"]
+	descriptor = type(_original_mail_queue_create)
+	original = getattr(_original_mail_queue_create, "__func__", _original_mail_queue_create)
+
+	@wraps(original)
+	def patched_create(*args, scheduled_at=None, **kwargs):
+		"""Patched _create that sends the email at `scheduled_at`."""
+		frappe.flags.pop("mail_scheduler_submission_id", None)
+
+		if not scheduled_at:
+			doc = original(*args, **kwargs)
+		else:
+			with scheduled_send(get_datetime(scheduled_at)):
+				doc = original(*args, **kwargs)
+
+		_store_submission_id(doc)
+		return doc
+
+	MailQueue._create = (
+		descriptor(patched_create)
+		if descriptor in (staticmethod, classmethod)
+		else patched_create
+	)
+	_log_debug("MailQueue._create patched successfully")
+	return True
+
+
+def _has_submission_id_column() -> bool:
+	"""Check once per site whether Mail Queue has the submission_id field."""
+	site = frappe.local.site
+	if site not in _submission_id_column:
+		_submission_id_column[site] = frappe.db.has_column("Mail Queue", "submission_id")
+	return _submission_id_column[site]
+
+
+def _store_submission_id(doc) -> None:
+	"""
+	Record the submission created by the scheduled send on its Mail Queue.
+
+	The write is buffered until the transaction commits, so all Mail Queues
+	scheduled in the same request or job are updated in one statement.
+
+	Args:
+		doc: Mail Queue document returned by MailQueue._create
+	"""
+	submission_id = frappe.flags.pop("mail_scheduler_submission_id", None)
+	if not submission_id or not getattr(doc, "name", None) or not _has_submission_id_column():
+		return
+
+	pending = getattr(frappe.local, "mail_scheduler_pending_submission_ids", None)
+	if pending is None:
+		pending = frappe.local.mail_scheduler_pending_submission_ids = {}
+		frappe.db.before_commit.add(_flush_submission_ids)
+		frappe.db.after_rollback.add(_discard_submission_ids)
+		invalidate_next_due()
+
+	pending[doc.name] = {"submission_id": submission_id}
+	doc.submission_id = submission_id
+
+
+def _flush_submission_ids() -> None:
+	"""Write the buffered submission ids, one UPDATE for all Mail Queues."""
+	pending = getattr(frappe.local, "mail_scheduler_pending_submission_ids", None)
+	frappe.local.mail_scheduler_pending_submission_ids = None
+	if pending:
+		frappe.db.bulk_update("Mail Queue", pending, update_modified=False)
+
+
+def _discard_submission_ids() -> None:
+	"""Drop the buffered submission ids of a rolled back transaction."""
+	frappe.local.mail_scheduler_pending_submission_ids = None
+
+
+def _extract_ids(responses: dict, creation_id) -> tuple[str | None, str | None]:
+	"""
+	Get the ids of the draft and the submission created for `creation_id`.
+
+	Args:
+		responses: Method name to arguments of the method responses
+		creation_id: Creation id the calls were built with
+
+	Returns:
+		tuple of the email id and the submission id (None when not created)
+	"""
+	emails = responses.get("Email/import") or responses.get("Email/set") or {}
+	try:
+		email_id = emails["created"][f"draft-{creation_id}"]["id"]
+	except (KeyError, TypeError):
+		email_id = None
+
+	try:
+		submission_id = responses["EmailSubmission/set"]["created"][f"submit-{creation_id}"]["id"]
+	except (KeyError, TypeError):
+		submission_id = None
+
+	return email_id, submission_id
+
+
+@lru_cache(maxsize=1)
+def _get_user_agent() -> str:
+	"""User-Agent header of scheduled emails; fixed for the life of the process."""
+	from mail import __version__
+
+	return f"Frappe Mail v{__version__} (Frappe v{frappe.__version__})"
+
+
+def _attachment_part(client, attachment: dict) -> dict:
+	"""Build the body part of an attachment of a scheduled email."""
+	part = {
+		"blobId": _get_attachment_blob_id(client, attachment),
+		"type": attachment.get("type", "application/octet-stream"),
+		"name": attachment.get("filename", "attachment"),
+		"disposition": "attachment",
+	}
+	if attachment.get("disposition") == "inline" and attachment.get("cid"):
+		part["disposition"] = "inline"
+		part["cid"] = attachment["cid"]
+	return part
+
+
+def _get_attachment_blob_id(client, attachment: dict) -> str:
+	"""
+	Get the blob of an attachment, uploading its content if it has none yet.
+
+	Keeps the bytes out of the Email/set request; the email only references
+	the uploaded blob.
+
+	Args:
+		client: JMAPClient to upload with
+		attachment: Attachment dict with a blob_id, or with its content
+
+	Returns:
+		The blob ID
+	"""
+	if blob_id := attachment.get("blob_id"):
+		return blob_id
+
+	content = attachment.get("content")
+	if content is None:
+		raise ValueError(f"Attachment {attachment.get('filename')} has neither a blob_id nor content")
+
+	blob = client.upload_blob(
+		content if isinstance(content, bytes) else content.encode("utf-8"),
+		content_type=attachment.get("type") or "application/octet-stream",
+	)
+	return blob["blobId"]
+
+
+def _get_cached_id(client, kind: str, key: str, loader: Callable[[], str]) -> str:
+	"""
+	Get an identity or mailbox ID of the client's account from the cache.
+
+	Args:
+		client: JMAPClient the ID belongs to
+		kind: "identity" or "mailbox"
+		key: Sender address or mailbox role
+		loader: Looks the ID up on a cache miss
+
+	Returns:
+		The ID
+	"""
+	cache_key = (frappe.local.site, client.primary_account_id, kind, key)
+	now = time.monotonic()
+
+	with _id_cache_lock:
+		cached = _id_cache.get(cache_key)
+	if cached and cached[1] > now:
+		return cached[0]
+
+	value = loader()
+	with _id_cache_lock:
+		_id_cache[cache_key] = (value, now + JMAP_ID_CACHE_TTL)
+	return value
+
+
+def _prefetch_ids(client, from_email: str) -> None:
+	"""
+	Cache the sender identity and the drafts and sent mailbox IDs in one request.
+
+	On a cold cache the separate lookups of _get_cached_id would cost a JMAP
+	round trip each. IDs the request does not return, e.g. a mailbox that
+	still has to be created, are left to those lookups.
+
+	Args:
+		client: JMAPClient of the sending user
+		from_email: Sender address
+	"""
+	site, account_id = frappe.local.site, client.primary_account_id
+	wanted = [("identity", from_email), ("mailbox", "drafts"), ("mailbox", "sent")]
+	now = time.monotonic()
+	with _id_cache_lock:
+		missing = [
+			key for key in wanted
+			if (cached := _id_cache.get((site, account_id, *key))) is None or cached[1] <= now
+		]
+	if len(missing) < 2:
+		# A single lookup costs the same round trip
+		return
+
+	try:
+		result = client._make_request(
+			using=["urn:ietf:params:jmap:mail", "urn:ietf:params:jmap:submission"],
+			method_calls=[
+				["Identity/get", {"accountId": account_id, "properties": ["id", "email"]}, "0"],
+				["Mailbox/get", {"accountId": account_id, "properties": ["id", "role"]}, "1"],
+			],
+		)
+	except Exception as e:
+		_log_error(f"Failed to prefetch identity and mailbox IDs: {e}")
+		return
+
+	found = {}
+	for method, args, _call_id in result.get("methodResponses", ()):
+		if method == "Identity/get":
+			for identity in args.get("list") or ():
+				if identity.get("email") == from_email:
+					found.setdefault(("identity", from_email), identity["id"])
+		elif method == "Mailbox/get":
+			for mailbox in args.get("list") or ():
+				if mailbox.get("role") in ("drafts", "sent"):
+					found.setdefault(("mailbox", mailbox["role"]), mailbox["id"])
+
+	expires = now + JMAP_ID_CACHE_TTL
+	with _id_cache_lock:
+		for key in missing:
+			if key in found:
+				_id_cache[(site, account_id, *key)] = (found[key], expires)
+
+
+def _drop_cached_ids(client) -> None:
+	"""Forget the cached identity and mailbox IDs of the client's account."""
+	site, account_id = frappe.local.site, client.primary_account_id
+	with _id_cache_lock:
+		for cache_key in [k for k in _id_cache if k[:2] == (site, account_id)]:
+			del _id_cache[cache_key]
+
+
+def _check_cached_ids(client, responses: Iterable[tuple[str, dict]]) -> None:
+	"""Drop the cached IDs if a method response reports an unknown object."""
+	for method, args in responses:
+		if method == "error":
+			errors = [args]
+		else:
+			errors = list((args.get("notCreated") or {}).values())
+
+		if any(error.get("type") in ("notFound", "invalidProperties") for error in errors):
+			_drop_cached_ids(client)
+			return
+
+
 def _email_create_with_schedule(
 	client,
 	creation_id,
@@ -223,24 +595,90 @@ def _email_create_with_schedule(
 	This is a modified version of JMAPClient.email_create that adds
 	the HOLDUNTIL parameter to the envelope for FUTURERELEASE support.
 	"""
-	from typing import Literal
-	from mail import __version__
+	# Submissions being replaced (reschedule) are cancelled in the same call
+	cancel_ids = frappe.flags.pop("mail_scheduler_cancel_submission_ids", None)
+
+	using, method_calls = _build_scheduled_calls(
+		client, creation_id, from_email, recipients, from_name, subject,
+		sent_at, message_id, reply_to, in_reply_to, headers, text_body,
+		html_body, attachments, raw_message, existing_id, priority,
+		destroy_after_submit, forwarded_id, reply_to_id, scheduled_at,
+		cancel_submission_ids=cancel_ids,
+	)
+
+	# Execute JMAP request
+	_log_debug(f"Executing JMAP request with {len(method_calls)} method calls")
+	
+	try:
+		result = client._make_request(using=using, method_calls=method_calls)
+		_log_info(f"Scheduled email submission successful for creation_id={creation_id}")
+		responses = {m[0]: m[1] for m in result.get("methodResponses", ())}
+		_check_cached_ids(client, responses.items())
+		# Picked up by the MailQueue._create patch (or reschedule_mail)
+		frappe.flags.mail_scheduler_submission_id = _extract_ids(responses, creation_id)[1]
+		return result
+	except Exception as e:
+		_log_error(f"JMAP request failed: {e}", exc=e)
+		_drop_cached_ids(client)
+		if cancel_ids:
+			# Hand the cancellation back to the caller
+			frappe.flags.mail_scheduler_cancel_submission_ids = cancel_ids
+		raise
+
+
+def _build_scheduled_calls(
+	client,
+	creation_id,
+	from_email,
+	recipients,
+	from_name,
+	subject,
+	sent_at,
+	message_id,
+	reply_to,
+	in_reply_to,
+	headers,
+	text_body,
+	html_body,
+	attachments,
+	raw_message,
+	existing_id,
+	priority,
+	destroy_after_submit,
+	forwarded_id,
+	reply_to_id,
+	scheduled_at,
+	cancel_submission_ids=None,
+):
+	"""
+	Build the JMAP calls that create and submit one scheduled email.
+
+	Takes the arguments of _email_create_with_schedule, plus:
+
+	Args:
+		cancel_submission_ids: Submissions to cancel in the same
+			EmailSubmission/set call (used when rescheduling)
+
+	Returns:
+		tuple of the capabilities used and the method calls
+	"""
 	from mail.utils.dt import convert_to_utc
 
+	from mail_scheduler.jmap.futurerelease import build_scheduled_envelope, get_holduntil_timestamp
+
 	# Calculate HOLDUNTIL timestamp (Unix epoch seconds)
-	schedule_dt = get_datetime(scheduled_at)
-	holduntil = int(schedule_dt.timestamp())
+	holduntil = get_holduntil_timestamp(scheduled_at)
 	
-	_log_info(f"Building scheduled submission: HOLDUNTIL={holduntil} ({schedule_dt})")
+	_log_info(f"Building scheduled submission: HOLDUNTIL={holduntil} ({scheduled_at})")
 
-	# HELPERS
-	def filter_recipients(kind: Literal["to", "cc", "bcc"]) -> list[dict[str, str | None]]:
-		return [
-			{"name": r.get("name", r.get("display_name", "")), "email": r["email"]}
-			for r in recipients
-			if r["type"].lower() == kind
-		]
+	# Split recipients by type in one pass
+	recipients_by_kind: dict[str, list[dict[str, str | None]]] = {"to": [], "cc": [], "bcc": []}
+	for r in recipients:
+		bucket = recipients_by_kind.get(r["type"].lower())
+		if bucket is not None:
+			bucket.append({"name": r.get("name", r.get("display_name", "")), "email": r["email"]})
 
+	# HELPERS
 	def build_draft_payload(draft_mbox: str) -> dict:
 		payload = {
 			"mailboxIds": {draft_mbox: True},
@@ -248,20 +686,20 @@ def _email_create_with_schedule(
 			"from": [{"name": from_name or "", "email": from_email}],
 		}
 
-		for kind in ("to", "cc", "bcc"):
-			if rcpts := filter_recipients(kind):
+		for kind, rcpts in recipients_by_kind.items():
+			if rcpts:
 				payload[kind] = rcpts
 
 		if subject:
 			payload["subject"] = subject
 
 		# Set sentAt to scheduled time for proper display
-		send_time = convert_to_utc(sent_at) if sent_at else convert_to_utc(frappe.utils.now_datetime())
+		send_time = convert_to_utc(sent_at) if sent_at else datetime.now(timezone.utc).replace(microsecond=0)
 		
 		payload.update({
 			"sentAt": send_time.isoformat(),
 			"header:Message-ID": f"<{message_id}>" if message_id else f"<{creation_id}@mail>",
-			"header:User-Agent": f"Frappe Mail v{__version__} (Frappe v{frappe.__version__})",
+			"header:User-Agent": _get_user_agent(),
 			"header:X-Mailer": "Frappe Mail",
 			"header:X-Mail-Queue": str(creation_id),
 			"header:X-Mail-Scheduled": str(holduntil),  # Custom header for tracking
@@ -280,18 +718,8 @@ def _email_create_with_schedule(
 				payload[f"header:{k}"] = str(v)
 
 		# Body parts
-		body_parts = []
-		if text_body:
-			body_parts.append({"type": "text/plain", "partId": "text"})
-		if html_body:
-			body_parts.append({"type": "text/html", "partId": "html"})
-
-		if body_parts:
-			payload["bodyStructure"] = (
-				{"type": "multipart/alternative", "subParts": body_parts}
-				if len(body_parts) > 1
-				else body_parts[0]
-			)
+		if body_structure := _BODY_TEMPLATES.get((bool(text_body), bool(html_body))):
+			payload["bodyStructure"] = body_structure
 			payload["bodyValues"] = {}
 			if text_body:
 				payload["bodyValues"]["text"] = {"value": text_body, "isEncodingProblem": False}
@@ -300,51 +728,39 @@ def _email_create_with_schedule(
 
 		# Attachments
 		if attachments:
-			atts = []
-			for a in attachments:
-				att = {
-					"blobId": a["blob_id"],
-					"type": a.get("type", "application/octet-stream"),
-					"name": a.get("filename", "attachment"),
-				}
-				if a.get("disposition") == "inline" and a.get("cid"):
-					att["disposition"] = "inline"
-					att["cid"] = a["cid"]
-				else:
-					att["disposition"] = "attachment"
-				atts.append(att)
-
-			if "bodyStructure" in payload:
-				payload["bodyStructure"] = {
-					"type": "multipart/mixed",
-					"subParts": [payload["bodyStructure"]] + [
-						{
-							"type": a["type"],
-							"blobId": a["blobId"],
-							"name": a.get("name"),
-							"disposition": a.get("disposition", "attachment")
-						}
-						for a in atts
-					],
-				}
+			atts = [_attachment_part(client, a) for a in attachments]
+
+			if body_structure:
+				payload["bodyStructure"] = {"type": "multipart/mixed", "subParts": [body_structure, *atts]}
 			else:
 				payload["attachments"] = atts
 
 		return payload
 
-	# Get required IDs with error handling
+	# Get required IDs with error handling; on a cold cache they are looked
+	# up together in one request
+	_prefetch_ids(client, from_email)
 	try:
-		identity_id = client.get_identity_id_by_email(from_email, raise_exception=True)
+		identity_id = _get_cached_id(
+			client, "identity", from_email,
+			lambda: client.get_identity_id_by_email(from_email, raise_exception=True),
+		)
 	except Exception as e:
 		_log_error(f"Failed to get identity for {from_email}: {e}")
 		raise
 
 	try:
-		draft_mailbox_id = client.get_mailbox_id_by_role(
-			"drafts", create_if_not_exists=True, raise_exception=True
+		draft_mailbox_id = _get_cached_id(
+			client, "mailbox", "drafts",
+			lambda: client.get_mailbox_id_by_role(
+				"drafts", create_if_not_exists=True, raise_exception=True
+			),
 		)
-		sent_mailbox_id = client.get_mailbox_id_by_role(
-			"sent", create_if_not_exists=True, raise_exception=True
+		sent_mailbox_id = _get_cached_id(
+			client, "mailbox", "sent",
+			lambda: client.get_mailbox_id_by_role(
+				"sent", create_if_not_exists=True, raise_exception=True
+			),
 		)
 	except Exception as e:
 		_log_error(f"Failed to get mailbox IDs: {e}")
@@ -411,27 +827,13 @@ def _email_create_with_schedule(
 	submission = {
 		"identityId": identity_id,
 		"emailId": f"#{draft_ref}",
-		"envelope": {
-			"mailFrom": {
-				"email": from_email,
-				"parameters": {
-					"RET": "FULL",
-					"ENVID": str(creation_id),
-					"MT-PRIORITY": str(priority),
-					"HOLDUNTIL": str(holduntil),  # FUTURERELEASE parameter
-				},
-			},
-			"rcptTo": [
-				{
-					"email": rcpt,
-					"parameters": {
-						"NOTIFY": "DELAY,FAILURE",
-						"ORCPT": f"rfc822;{rcpt}",
-					},
-				}
-				for rcpt in sorted({r["email"] for r in recipients})
-			],
-		},
+		"envelope": build_scheduled_envelope(
+			from_email,
+			tuple(r["email"] for r in recipients),
+			str(creation_id),
+			priority,
+			holduntil=holduntil,
+		),
 	}
 
 	submit_call = [
@@ -464,18 +866,14 @@ def _email_create_with_schedule(
 	if updates:
 		submit_call[1]["onSuccessUpdateEmail"] = updates
 
+	if cancel_submission_ids:
+		submit_call[1]["update"] = {
+			submission_id: {"undoStatus": "canceled"} for submission_id in cancel_submission_ids
+		}
+
 	method_calls.append(submit_call)
 
-	# Execute JMAP request
-	_log_debug(f"Executing JMAP request with {len(method_calls)} method calls")
-	
-	try:
-		result = client._make_request(using=using, method_calls=method_calls)
-		_log_info(f"Scheduled email submission successful for creation_id={creation_id}")
-		return result
-	except Exception as e:
-		_log_error(f"JMAP request failed: {e}", exc=e)
-		raise
+	return using, method_calls
 
 
 def remove_patches() -> bool:
@@ -485,7 +883,7 @@ def remove_patches() -> bool:
 	Returns:
 		True if patches were removed successfully
 	"""
-	global _original_email_create, _patch_applied
+	global _original_email_create, _original_mail_queue_create, _patch_applied
 	
 	with _patch_lock:
 		if not _patch_applied:
@@ -497,6 +895,12 @@ def remove_patches() -> bool:
 			if _original_email_create is not None:
 				JMAPClient.email_create = _original_email_create
 				_original_email_create = None
+
+			if _original_mail_queue_create is not None:
+				from mail.client.doctype.mail_queue.mail_queue import MailQueue
+
+				MailQueue._create = _original_mail_queue_create
+				_original_mail_queue_create = None
 			
 			_patch_applied = False
 			_log_info("Monkey patches removed successfully")
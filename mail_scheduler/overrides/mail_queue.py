@@ -6,18 +6,24 @@ These hooks extend Mail Queue behavior to support scheduled sending
 without modifying the core mail app's doctype.
 """
 
+from datetime import timedelta
+
 import frappe
 from frappe import _
+from frappe.utils import get_datetime, now_datetime
+
+from mail_scheduler.jmap.futurerelease import get_max_schedule_seconds
+from mail_scheduler.utils import get_scheduled_at
 
 
 def before_insert(doc, method=None):
 	"""
 	Before inserting Mail Queue, check for scheduled_at in context.
 
-	The scheduled_at value is passed via frappe.flags when creating
-	mail queue entries for scheduled emails.
+	The scheduled_at value is set with mail_scheduler.utils.scheduled_send
+	around the creation of mail queue entries for scheduled emails.
 	"""
-	scheduled_at = frappe.flags.get("mail_scheduler_scheduled_at")
+	scheduled_at = get_scheduled_at()
 	if scheduled_at:
 		# Store in custom field (must be created via fixtures)
 		doc.scheduled_at = scheduled_at
@@ -33,18 +39,15 @@ def validate(doc, method=None):
 	if not scheduled_at:
 		return
 
-	from frappe.utils import get_datetime, now_datetime
-
-	from mail_scheduler.jmap.futurerelease import get_max_schedule_seconds
-
 	scheduled_datetime = get_datetime(scheduled_at)
 	now = now_datetime()
 
 	if scheduled_datetime <= now:
 		frappe.throw(_("Scheduled time must be in the future"))
 
+	# A site config lookup, so it always matches the API's check
 	max_seconds = get_max_schedule_seconds()
-	max_datetime = now + frappe.utils.datetime.timedelta(seconds=max_seconds)
+	max_datetime = now + timedelta(seconds=max_seconds)
 
 	if scheduled_datetime > max_datetime:
 		max_days = max_seconds // 86400
@@ -0,0 +1,12 @@
+# type: ignore
+"""
+Add composite indexes on Mail Queue for the scheduled email queries.
+"""
+
+from mail_scheduler.setup import add_mail_queue_indexes, create_mail_queue_custom_fields
+
+
+def execute():
+	# The indexes cover scheduled_at, so make sure the custom field exists
+	create_mail_queue_custom_fields()
+	add_mail_queue_indexes()
@@ -0,0 +1,11 @@
+# type: ignore
+"""
+Add the (status, scheduled_at) index on Mail Queue for the status poll.
+"""
+
+from mail_scheduler.setup import add_mail_queue_indexes
+
+
+def execute():
+	# add_index skips indexes that already exist
+	add_mail_queue_indexes()
@@ -10,6 +10,7 @@ from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 def after_install():
 	"""Run after app installation."""
 	create_mail_queue_custom_fields()
+	add_mail_queue_indexes()
 
 
 def create_mail_queue_custom_fields():
@@ -40,3 +41,16 @@ def create_mail_queue_custom_fields():
 
 	create_custom_fields(custom_fields)
 	frappe.db.commit()
+
+
+def add_mail_queue_indexes():
+	"""
+	Add the composite indexes used by the scheduled email queries.
+
+	(user, scheduled_at, status) serves the per-user lists and counts,
+	(user, id) the lookups by JMAP email ID and (status, scheduled_at) the
+	status poll, which scans pending emails of all users.
+	"""
+	frappe.db.add_index("Mail Queue", ["user", "scheduled_at", "status"])
+	frappe.db.add_index("Mail Queue", ["user", "id"])
+	frappe.db.add_index("Mail Queue", ["status", "scheduled_at"])
@@ -5,8 +5,65 @@ Scheduled Tasks for Mail Scheduler
 Background tasks for managing scheduled emails.
 """
 
+import traceback
+from datetime import timedelta
+
 import frappe
 from frappe import _
+from frappe.query_builder.functions import Min
+from frappe.utils import cint, get_datetime, now_datetime
+
+from mail_scheduler.api.mail import (
+	_bulk_set_mail_queue_status,
+	_create_mail_queue,
+	_create_mail_queues,
+	_invalidate_scheduled_mail_count,
+	_store_mail_batch_results,
+)
+from mail_scheduler.jmap.futurerelease import email_submissions_get_many
+from mail_scheduler.utils import NEXT_DUE_CACHE_KEY
+
+DEFAULT_POLL_CLAIM_SIZE = 500  # scheduled emails polled and committed together
+NEXT_DUE_CACHE_TTL = 3600  # seconds; bounds how long a stale due time can skip polls
+
+_PENDING_STATUSES = ("Scheduled", "Queued", "Pending")
+
+
+def send_scheduled_mail(create_kwargs: dict, scheduled_at: str) -> dict:
+	"""
+	Create and submit a scheduled email queued by create_mail.
+
+	Args:
+		create_kwargs: Keyword arguments for MailQueue._create
+		scheduled_at: Datetime string for scheduled delivery
+
+	Returns:
+		dict with id, status, error, and scheduled_at
+	"""
+	return _create_mail_queue(create_kwargs, scheduled_at)
+
+
+def send_scheduled_mails(items: list[tuple[dict, str]], batch_id: str | None = None) -> list[dict]:
+	"""
+	Create and submit the scheduled emails queued by create_mail_batch.
+
+	Args:
+		items: MailQueue._create arguments and schedule time per email
+		batch_id: Batch to store the results under, for get_mail_batch_results
+
+	Returns:
+		list of results, in the order of `items`
+	"""
+	try:
+		results = _create_mail_queues(items)
+	except Exception as e:
+		if batch_id:
+			_store_mail_batch_results(batch_id, "Failed", error=str(e))
+		raise
+
+	if batch_id:
+		_store_mail_batch_results(batch_id, "Done", results)
+	return results
 
 
 def check_scheduled_emails_status():
@@ -17,103 +74,184 @@ def check_scheduled_emails_status():
 	1. Mark sent emails as "Sent"
 	2. Handle failed deliveries
 	3. Clean up expired submissions
+
+	Each claim locks up to _get_poll_claim_size() emails in one SELECT ...
+	FOR UPDATE SKIP LOCKED and is committed on its own, so overlapping runs
+	split the work instead of polling the same emails, and a failure only
+	affects the claim it happened in.
+
+	Only emails whose schedule time has passed are polled. The earliest
+	schedule time still ahead is cached, and runs before it return without
+	querying; scheduling an email clears the cache (see invalidate_next_due).
 	"""
-	from mail.jmap import get_jmap_client
-
-	# Get scheduled emails that might have been sent
-	scheduled_emails = frappe.get_all(
-		"Mail Queue",
-		filters={
-			"scheduled_at": ["is", "set"],
-			"status": ["in", ["Scheduled", "Queued", "Pending"]],
-			"submission_id": ["is", "set"],
-		},
-		fields=["name", "user", "submission_id", "scheduled_at"],
+	now = now_datetime()
+	next_due = frappe.cache().get_value(NEXT_DUE_CACHE_KEY)
+	if next_due and get_datetime(next_due) > now:
+		return
+
+	claim_size = _get_poll_claim_size()
+	last = None
+	while True:
+		emails = _claim_scheduled_emails(now, claim_size, last)
+		if not emails:
+			break
+
+		changed_users = _update_scheduled_emails_status(emails)
+		frappe.db.commit()
+		for user in changed_users:
+			_invalidate_scheduled_mail_count(user)
+
+		if len(emails) < claim_size:
+			break
+		last = emails[-1]
+
+	_cache_next_due(now)
+
+
+def _pending_emails_query():
+	"""Query on the scheduled emails that still have a submission to poll."""
+	MailQueue = frappe.qb.DocType("Mail Queue")
+	return (
+		frappe.qb.from_(MailQueue)
+		.where(MailQueue.scheduled_at.isnotnull())
+		.where(MailQueue.status.isin(_PENDING_STATUSES))
+		.where(MailQueue.submission_id.isnotnull() & (MailQueue.submission_id != ""))
 	)
 
-	if not scheduled_emails:
+
+def _cache_next_due(now) -> None:
+	"""
+	Cache the earliest schedule time of the pending emails.
+
+	Nothing is cached while due emails are still pending, so they are polled
+	again on the next run. With none pending, the next poll runs when the
+	cache expires.
+	"""
+	MailQueue = frappe.qb.DocType("Mail Queue")
+	next_due = _pending_emails_query().select(Min(MailQueue.scheduled_at)).run()[0][0]
+	if next_due and get_datetime(next_due) <= now:
+		frappe.cache().delete_value(NEXT_DUE_CACHE_KEY)
 		return
 
-	# Group by user for efficient JMAP calls
-	user_emails = {}
-	for email in scheduled_emails:
-		user_emails.setdefault(email.user, []).append(email)
+	frappe.cache().set_value(
+		NEXT_DUE_CACHE_KEY,
+		str(next_due or now + timedelta(seconds=NEXT_DUE_CACHE_TTL)),
+		expires_in_sec=NEXT_DUE_CACHE_TTL,
+	)
 
-	for user, emails in user_emails.items():
-		try:
-			client = get_jmap_client(user)
-			submission_ids = [e.submission_id for e in emails]
 
-			# Get submission statuses
-			response = _get_submissions_batch(client, submission_ids)
-			submissions = response.get("methodResponses", [[]])[0][1].get("list", [])
-			submission_map = {s["id"]: s for s in submissions}
+def _get_poll_claim_size() -> int:
+	"""
+	Get how many scheduled emails a status poll claims at a time.
+
+	Set `mail_scheduler_poll_claim_size` in the site config to tune it;
+	defaults to DEFAULT_POLL_CLAIM_SIZE.
+	"""
+	return cint(frappe.conf.get("mail_scheduler_poll_claim_size")) or DEFAULT_POLL_CLAIM_SIZE
 
-			for email in emails:
-				submission = submission_map.get(email.submission_id)
 
-				if not submission:
-					# Submission not found - might be sent and cleaned up
-					_check_if_sent(email)
-					continue
+def _claim_scheduled_emails(now, limit: int, after=None) -> list[dict]:
+	"""
+	Lock the next due scheduled emails to poll, skipping rows locked elsewhere.
 
-				undo_status = submission.get("undoStatus")
+	Args:
+		now: Emails scheduled after this time are not due yet
+		limit: Maximum number of emails to claim
+		after: Last email of the previous claim; claims continue after it
+			in (scheduled_at, name) order
 
-				if undo_status == "final":
-					# Email has been sent
-					frappe.db.set_value("Mail Queue", email.name, "status", "Sent")
+	Returns:
+		list of dicts with name, user, submission_id and scheduled_at
+	"""
+	MailQueue = frappe.qb.DocType("Mail Queue")
+	query = (
+		_pending_emails_query()
+		.select(MailQueue.name, MailQueue.user, MailQueue.submission_id, MailQueue.scheduled_at)
+		.where(MailQueue.scheduled_at <= now)
+		.orderby(MailQueue.scheduled_at)
+		.orderby(MailQueue.name)
+		.limit(limit)
+		.for_update(skip_locked=True)
+	)
+	if after:
+		query = query.where(
+			(MailQueue.scheduled_at > after.scheduled_at)
+			| ((MailQueue.scheduled_at == after.scheduled_at) & (MailQueue.name > after.name))
+		)
 
-				elif undo_status == "canceled":
-					# Email was cancelled externally
-					frappe.db.set_value("Mail Queue", email.name, "status", "Cancelled")
+	return query.run(as_dict=True)
+
+
+def _update_scheduled_emails_status(scheduled_emails: list[dict]) -> list[str]:
+	"""
+	Poll the JMAP submissions of claimed emails and update their status.
+
+	Args:
+		scheduled_emails: Emails returned by _claim_scheduled_emails
+
+	Returns:
+		Users whose scheduled email counts changed
+	"""
+	# Group by user for efficient JMAP calls
+	user_emails = {}
+	for email in scheduled_emails:
+		user_emails.setdefault(email.user, []).append(email)
 
-				# "pending" means still scheduled, no action needed
+	# Names to update, grouped by their new status
+	status_updates = {"Sent": [], "Cancelled": []}
 
-			frappe.db.commit()
+	# All submission statuses of a user in one request, users in parallel
+	submissions_by_user = email_submissions_get_many({
+		user: [e.submission_id for e in emails] for user, emails in user_emails.items()
+	})
 
-		except Exception:
+	for user, emails in user_emails.items():
+		submission_map = submissions_by_user.get(user, {})
+		if isinstance(submission_map, Exception):
 			frappe.log_error(
 				_("Failed to check scheduled emails for user {0}").format(user),
-				frappe.get_traceback(with_context=True)
+				"".join(traceback.format_exception(submission_map)),
 			)
+			continue
 
+		for email in emails:
+			submission = submission_map.get(email.submission_id)
 
-def _check_if_sent(email):
-	"""
-	Check if email was sent by looking at scheduled time.
+			if not submission:
+				# Submission not found - might be sent and cleaned up
+				if _check_if_sent(email):
+					status_updates["Sent"].append(email.name)
+				continue
 
-	If scheduled time has passed and submission is gone, assume sent.
-	"""
-	from frappe.utils import get_datetime, now_datetime
+			undo_status = submission.get("undoStatus")
 
-	scheduled_datetime = get_datetime(email.scheduled_at)
+			if undo_status == "final":
+				# Email has been sent
+				status_updates["Sent"].append(email.name)
+
+			elif undo_status == "canceled":
+				# Email was cancelled externally
+				status_updates["Cancelled"].append(email.name)
 
-	if scheduled_datetime < now_datetime():
-		# Scheduled time has passed, mark as sent
-		frappe.db.set_value("Mail Queue", email.name, "status", "Sent")
+			# "pending" means still scheduled, no action needed
 
+	# One UPDATE per status instead of one per email
+	for status, names in status_updates.items():
+		_bulk_set_mail_queue_status(names, status)
 
-def _get_submissions_batch(client, submission_ids: list[str]) -> dict:
+	return list(user_emails) if any(status_updates.values()) else []
+
+
+def _check_if_sent(email) -> bool:
 	"""
-	Get multiple submission statuses in a single JMAP call.
+	Check if email was sent by looking at scheduled time.
 
-	Args:
-		client: JMAPClient instance
-		submission_ids: List of submission IDs to retrieve
+	If scheduled time has passed and submission is gone, assume sent.
 
 	Returns:
-		JMAP response with submission details
-	"""
-	return client._make_request(
-		using=["urn:ietf:params:jmap:mail", "urn:ietf:params:jmap:submission"],
-		method_calls=[
-			[
-				"EmailSubmission/get",
-				{
-					"accountId": client.primary_account_id,
-					"ids": submission_ids,
-				},
-				"0",
-			]
-		],
-	)
+		True if the email should be marked as sent
+	"""
+	scheduled_datetime = get_datetime(email.scheduled_at)
+
+	# Scheduled time has passed, mark as sent
+	return scheduled_datetime < now_datetime()
@@ -3,9 +3,11 @@
 Battle test: Send a scheduled email using mail_scheduler
 """
 
-import frappe
+import traceback
 from datetime import datetime, timedelta
 
+import frappe
+
 def test_scheduled_email():
     """Test sending a scheduled email"""
     from mail_scheduler.api.mail import create_mail
@@ -46,9 +48,104 @@ def test_scheduled_email():
         
         return result
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return {"success": False, "error": str(e)}
 
+def test_reschedule_scheduled_email():
+    """Test moving a scheduled email to a later time"""
+    from mail_scheduler.api.mail import create_mail, reschedule_mail
+    
+    user = "admin@frappe.mn"
+    frappe.set_user(user)
+    
+    # Schedule for 5 minutes from now, then move it to 10 minutes from now
+    schedule_time = datetime.now() + timedelta(minutes=5)
+    new_schedule_time = schedule_time + timedelta(minutes=5)
+    
+    print(f"=== Reschedule Email Test ===")
+    print(f"User: {user}")
+    print(f"Scheduled for: {schedule_time}")
+    print(f"Rescheduled for: {new_schedule_time}")
+    
+    created = create_mail(
+        from_email="admin@frappe.mn",
+        to=["test@icloud.mn"],
+        cc=[],
+        bcc=[],
+        subject=f"[TEST] Reschedule Email Test - {schedule_time.strftime('%Y-%m-%d %H:%M:%S')}",
+        html_body="<p>This is a rescheduled test email from mail_scheduler addon.</p>",
+        from_name="Mail Scheduler Test",
+        scheduled_at=schedule_time.isoformat()
+    )
+    mail_queue_name = created.get('mail_queue_name')
+    assert mail_queue_name, f"email was not created: {created}"
+    
+    result = reschedule_mail(mail_queue_name, new_schedule_time.isoformat())
+    scheduled_at = frappe.db.get_value("Mail Queue", mail_queue_name, "scheduled_at")
+    
+    print(f"\n=== Result ===")
+    print(f"Mail Queue: {mail_queue_name}")
+    print(f"Success: {result.get('success')}")
+    print(f"Scheduled At: {scheduled_at}")
+    
+    assert result.get('success'), f"reschedule failed: {result}"
+    assert scheduled_at.replace(microsecond=0) == new_schedule_time.replace(microsecond=0), (
+        f"expected {new_schedule_time}, got {scheduled_at}"
+    )
+    return result
+
+def test_scheduled_email_batch(count=100):
+    """Test scheduling a batch of emails in one call"""
+    from mail_scheduler.api.mail import cancel_scheduled_mails, create_mail_batch
+    
+    user = "admin@frappe.mn"
+    frappe.set_user(user)
+    
+    # Schedule for 5 minutes from now, to the sender's own address; the
+    # emails are cancelled before they are due
+    schedule_time = datetime.now() + timedelta(minutes=5)
+    
+    print(f"=== Scheduled Email Batch Test ===")
+    print(f"User: {user}")
+    print(f"Emails: {count}")
+    print(f"Recipient: {user}")
+    print(f"Scheduled for: {schedule_time}")
+    
+    messages = [
+        {
+            "from_email": "admin@frappe.mn",
+            "to": [user],
+            "subject": f"[TEST] Scheduled Batch Email {i + 1}/{count} - {schedule_time.strftime('%Y-%m-%d %H:%M:%S')}",
+            "html_body": f"<p>Scheduled batch email {i + 1} of {count} from mail_scheduler addon.</p>",
+            "from_name": "Mail Scheduler Test",
+            "scheduled_at": schedule_time.isoformat(),
+        }
+        for i in range(count)
+    ]
+    
+    result = create_mail_batch(messages, wait=True)
+    results = result.get("results") or []
+    
+    print(f"\n=== Result ===")
+    print(f"Results: {len(results)}")
+    print(f"With ID: {sum(1 for r in results if r.get('id'))}")
+    for r in results:
+        if r.get('error'):
+            print(f"Error: {r.get('error')}")
+    
+    try:
+        assert len(results) == count, f"expected {count} results, got {len(results)}"
+        for i, r in enumerate(results):
+            assert r.get('id'), f"email {i + 1} was not created: {r}"
+            assert r.get('status') == "Scheduled", f"email {i + 1} is {r.get('status')}: {r.get('error')}"
+    finally:
+        created = [r['mail_queue_name'] for r in results if r.get('mail_queue_name')]
+        if created:
+            cancelled = cancel_scheduled_mails(created)
+            print(f"Cancelled: {len(cancelled.get('cancelled') or [])}/{len(created)}")
+    return result
+
 if __name__ == "__main__":
     test_scheduled_email()
+    test_reschedule_scheduled_email()
+    test_scheduled_email_batch()
@@ -2,6 +2,55 @@
 Utility functions for Mail Scheduler
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import frappe
+
 from mail_scheduler.jmap.futurerelease import get_max_schedule_days
 
-__all__ = ["get_max_schedule_days"]
+__all__ = ["get_max_schedule_days", "get_scheduled_at", "invalidate_next_due", "scheduled_send"]
+
+# Earliest schedule time the status poll is waiting for; see
+# mail_scheduler.tasks.check_scheduled_emails_status
+NEXT_DUE_CACHE_KEY = "mail_scheduler:next_scheduled_at"
+
+# Schedule time of the email being created or submitted in this context,
+# read by the Mail Queue before_insert hook and the patched email_create
+_scheduled_at: ContextVar[datetime | None] = ContextVar("mail_scheduler_scheduled_at", default=None)
+
+
+def get_scheduled_at() -> datetime | None:
+	"""Get the schedule time of the email being sent in this context."""
+	return _scheduled_at.get()
+
+
+@contextmanager
+def scheduled_send(scheduled_at: datetime | None):
+	"""
+	Send the emails created or submitted inside the block at `scheduled_at`.
+
+	Args:
+		scheduled_at: Time to hold the emails until; None sends immediately
+	"""
+	token = _scheduled_at.set(scheduled_at)
+	try:
+		yield
+	finally:
+		_scheduled_at.reset(token)
+
+
+def invalidate_next_due() -> None:
+	"""
+	Make the next status poll run instead of waiting for the cached due time.
+
+	Called when an email is scheduled or moved to an earlier time. The cache
+	is cleared once the transaction commits, so the poll that recomputes it
+	sees the new email.
+	"""
+	frappe.db.after_commit.add(_clear_next_due)
+
+
+def _clear_next_due() -> None:
+	frappe.cache().delete_value(NEXT_DUE_CACHE_KEY)
@@ -6,32 +6,57 @@ This extends the mail app's mail page to include the scheduler script.
 
 import frappe
 from frappe import _
+from frappe.utils.caching import site_cache
+
+from mail_scheduler.jmap.futurerelease import get_max_schedule_days
 
 no_cache = 1
 
+# Scheduler config that doesn't depend on the site
+_MS_STATIC = {"enabled": True, "min_schedule_minutes": 1}
+
 
 def get_context():
     """Get context for the mail page, extending the original mail app's context."""
-    frappe.db.commit()
-    context = frappe._dict()
-    context.boot = get_boot()
-    return context
+    return frappe._dict(boot=get_boot())
 
 
 def get_boot():
     """Get boot data including mail scheduler configuration."""
-    from mail_scheduler.jmap.futurerelease import get_max_schedule_days
-    
-    return frappe._dict(
-        {
-            "site_name": frappe.local.site,
-            "csrf_token": frappe.sessions.get_csrf_token(),
-            "push_relay_server_url": frappe.conf.get("push_relay_server_url") or "",
-            # Mail scheduler configuration
-            "mail_scheduler": {
-                "enabled": True,
-                "max_schedule_days": get_max_schedule_days(),
-                "min_schedule_minutes": 1,
-            },
-        }
-    )
+    return frappe._dict(_get_static_boot(), csrf_token=_get_csrf_token())
+
+
+def _get_csrf_token() -> str:
+    # Guests can't post anything, so don't create a session token for them
+    if frappe.session.user == "Guest":
+        return ""
+
+    if frappe.session.data.get("csrf_token"):
+        return frappe.session.data.csrf_token
+
+    # A new token is saved on the session, and GET requests are not
+    # committed by the request cycle, so commit it here
+    csrf_token = frappe.sessions.get_csrf_token()
+    frappe.db.commit()
+    return csrf_token
+
+
+@site_cache(ttl=60)
+def _get_static_boot() -> dict:
+    """Get the boot data that is the same for every session, cached per site."""
+    return {
+        "site_name": frappe.local.site,
+        "push_relay_server_url": frappe.conf.get("push_relay_server_url") or "",
+        # Mail scheduler configuration
+        "mail_scheduler": {
+            **_MS_STATIC,
+            # Read from the site config, so it is picked up with the rest of the
+            # boot data once the site cache expires
+            "max_schedule_days": get_max_schedule_days(),
+        },
+    }
+
+
+def invalidate_boot_cache():
+    """Drop this process's cached boot data; called on bench clear-cache."""
+    _get_static_boot.clear_cache()